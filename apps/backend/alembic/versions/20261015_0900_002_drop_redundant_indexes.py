@@ -0,0 +1,43 @@
+"""Drop single-column indexes covered by composite indexes
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-15 09:00:00.000000
+
+A B-tree on (a, b) already serves lookups on a alone, so these indexes only
+add write amplification on every ingest.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Covered by idx_account_symbol / idx_symbol_executed_at
+    op.drop_index(op.f('ix_normalized_trades_account_id'), table_name='normalized_trades')
+    op.drop_index(op.f('ix_normalized_trades_symbol'), table_name='normalized_trades')
+
+    # Covered by idx_account_close_date / idx_symbol_close_date.
+    # close_executed_at is never filtered without account_id.
+    op.drop_index(op.f('ix_closed_lots_account_id'), table_name='closed_lots')
+    op.drop_index(op.f('ix_closed_lots_symbol'), table_name='closed_lots')
+    op.drop_index(op.f('ix_closed_lots_close_executed_at'), table_name='closed_lots')
+
+    # Covered by idx_account_date
+    op.drop_index(op.f('ix_per_day_pnl_account_id'), table_name='per_day_pnl')
+
+
+def downgrade() -> None:
+    op.create_index(op.f('ix_per_day_pnl_account_id'), 'per_day_pnl', ['account_id'])
+
+    op.create_index(op.f('ix_closed_lots_close_executed_at'), 'closed_lots', ['close_executed_at'])
+    op.create_index(op.f('ix_closed_lots_symbol'), 'closed_lots', ['symbol'])
+    op.create_index(op.f('ix_closed_lots_account_id'), 'closed_lots', ['account_id'])
+
+    op.create_index(op.f('ix_normalized_trades_symbol'), 'normalized_trades', ['symbol'])
+    op.create_index(op.f('ix_normalized_trades_account_id'), 'normalized_trades', ['account_id'])
@@ -0,0 +1,31 @@
+"""Extend idx_account_symbol with executed_at as trailing sort key
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-15 09:10:00.000000
+
+FIFO processing reads trades per account and symbol in execution order;
+with executed_at in the index the scan comes back pre-sorted.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'idx_account_symbol_executed_at',
+        'normalized_trades',
+        ['account_id', 'symbol', 'executed_at']
+    )
+    op.drop_index('idx_account_symbol', table_name='normalized_trades')
+
+
+def downgrade() -> None:
+    op.create_index('idx_account_symbol', 'normalized_trades', ['account_id', 'symbol'])
+    op.drop_index('idx_account_symbol_executed_at', table_name='normalized_trades')
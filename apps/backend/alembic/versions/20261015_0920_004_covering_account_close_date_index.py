@@ -0,0 +1,32 @@
+"""Make idx_account_close_date a covering index
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-15 09:20:00.000000
+
+Metrics aggregation reads realized_pnl and symbol for every lot of an
+account; INCLUDE-ing them allows an index-only scan.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.drop_index('idx_account_close_date', table_name='closed_lots')
+    op.create_index(
+        'idx_account_close_date',
+        'closed_lots',
+        ['account_id', 'close_executed_at'],
+        postgresql_include=['realized_pnl', 'symbol']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_account_close_date', table_name='closed_lots')
+    op.create_index('idx_account_close_date', 'closed_lots', ['account_id', 'close_executed_at'])
@@ -0,0 +1,37 @@
+"""Add partial indexes for the demo (account_id IS NULL) path
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-15 09:30:00.000000
+
+Demo endpoints and the AI coach read account_id IS NULL rows; partial
+indexes over just those rows are much smaller than the full composites.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'idx_closed_lots_demo',
+        'closed_lots',
+        ['close_executed_at'],
+        postgresql_where=sa.text('account_id IS NULL')
+    )
+    op.create_index(
+        'idx_per_day_pnl_demo',
+        'per_day_pnl',
+        ['date'],
+        postgresql_where=sa.text('account_id IS NULL')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_per_day_pnl_demo', table_name='per_day_pnl')
+    op.drop_index('idx_closed_lots_demo', table_name='closed_lots')
@@ -0,0 +1,43 @@
+"""Add generated EST close_date/close_weekday columns and BRIN index to closed_lots
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-15 09:40:00.000000
+
+Daily and weekday rollups group lots by their EST close date; storing it
+avoids recomputing the conversion per row. close_executed_at is appended
+in time order, which suits a compact BRIN index for range scans.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "ALTER TABLE closed_lots ADD COLUMN close_date DATE "
+        "GENERATED ALWAYS AS ((close_executed_at AT TIME ZONE 'America/New_York')::date) STORED"
+    )
+    op.execute(
+        "ALTER TABLE closed_lots ADD COLUMN close_weekday SMALLINT "
+        "GENERATED ALWAYS AS "
+        "(EXTRACT(DOW FROM close_executed_at AT TIME ZONE 'America/New_York')::smallint) STORED"
+    )
+    op.create_index(
+        'idx_closed_lots_brin_close',
+        'closed_lots',
+        ['close_executed_at'],
+        postgresql_using='brin',
+        postgresql_with={'pages_per_range': 32}
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_closed_lots_brin_close', table_name='closed_lots')
+    op.drop_column('closed_lots', 'close_weekday')
+    op.drop_column('closed_lots', 'close_date')
@@ -0,0 +1,74 @@
+"""Store side/position_type/weekday as ENUMs and symbols as TEXT
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-15 09:50:00.000000
+
+side, position_type and the weekday columns have a handful of values; ENUMs
+store them in 4 bytes and group cheaply. Symbols move from VARCHAR(10) to
+TEXT, which Postgres stores identically without the per-insert length check.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+trade_side = postgresql.ENUM('BUY', 'SELL', name='trade_side')
+position_type = postgresql.ENUM('LONG', 'SHORT', name='position_type')
+weekday_name = postgresql.ENUM(
+    'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday',
+    name='weekday_name'
+)
+
+# (table, column, enum type)
+ENUM_COLUMNS = [
+    ('normalized_trades', 'side', trade_side),
+    ('closed_lots', 'position_type', position_type),
+    ('aggregates', 'best_weekday', weekday_name),
+    ('aggregates', 'worst_weekday', weekday_name),
+]
+
+# (table, column) - VARCHAR -> TEXT is binary compatible, no table rewrite
+SYMBOL_COLUMNS = [
+    ('normalized_trades', 'symbol'),
+    ('closed_lots', 'symbol'),
+    ('aggregates', 'best_symbol'),
+    ('aggregates', 'worst_symbol'),
+]
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    for enum in (trade_side, position_type, weekday_name):
+        enum.create(bind, checkfirst=True)
+
+    for table, column, enum in ENUM_COLUMNS:
+        op.alter_column(
+            table, column,
+            type_=enum,
+            postgresql_using=f'{column}::{enum.name}'
+        )
+
+    for table, column in SYMBOL_COLUMNS:
+        op.alter_column(table, column, type_=sa.Text())
+
+
+def downgrade() -> None:
+    for table, column in SYMBOL_COLUMNS:
+        op.alter_column(table, column, type_=sa.String(length=10))
+
+    for table, column, enum in ENUM_COLUMNS:
+        op.alter_column(
+            table, column,
+            type_=sa.String(length=10),
+            postgresql_using=f'{column}::text'
+        )
+
+    bind = op.get_bind()
+    for enum in (weekday_name, position_type, trade_side):
+        enum.drop(bind, checkfirst=True)
@@ -0,0 +1,93 @@
+"""Replace UUID primary keys on normalized_trades and closed_lots with BIGINT identity
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-15 10:00:00.000000
+
+Random UUIDs scatter primary key inserts across the whole index; an identity
+column appends in order and halves the key size. ingest_job_id stays a UUID
+since it is returned to clients.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+
+def _swap_primary_key(table: str, new_column: str) -> None:
+    """Drop the current id primary key and promote new_column in its place."""
+    op.drop_constraint(f'{table}_pkey', table, type_='primary')
+    op.drop_column(table, 'id')
+    op.alter_column(table, new_column, new_column_name='id')
+    op.create_primary_key(f'{table}_pkey', table, ['id'])
+
+
+def upgrade() -> None:
+    # Existing rows are numbered as the column is added
+    op.execute(
+        "ALTER TABLE normalized_trades "
+        "ADD COLUMN id_new BIGINT GENERATED ALWAYS AS IDENTITY"
+    )
+
+    # Re-point closed lots at the new trade ids
+    op.add_column('closed_lots', sa.Column('open_trade_id_new', sa.BigInteger(), nullable=True))
+    op.add_column('closed_lots', sa.Column('close_trade_id_new', sa.BigInteger(), nullable=True))
+    op.execute(
+        "UPDATE closed_lots c SET open_trade_id_new = o.id_new, close_trade_id_new = x.id_new "
+        "FROM normalized_trades o, normalized_trades x "
+        "WHERE o.id = c.open_trade_id AND x.id = c.close_trade_id"
+    )
+    # Lots are derived data; any without both source trades are rebuilt on next process
+    op.execute(
+        "DELETE FROM closed_lots "
+        "WHERE open_trade_id_new IS NULL OR close_trade_id_new IS NULL"
+    )
+    op.drop_column('closed_lots', 'open_trade_id')
+    op.drop_column('closed_lots', 'close_trade_id')
+    op.alter_column('closed_lots', 'open_trade_id_new', new_column_name='open_trade_id', nullable=False)
+    op.alter_column('closed_lots', 'close_trade_id_new', new_column_name='close_trade_id', nullable=False)
+
+    _swap_primary_key('normalized_trades', 'id_new')
+
+    op.execute(
+        "ALTER TABLE closed_lots "
+        "ADD COLUMN id_new BIGINT GENERATED ALWAYS AS IDENTITY"
+    )
+    _swap_primary_key('closed_lots', 'id_new')
+
+
+def downgrade() -> None:
+    op.add_column(
+        'closed_lots',
+        sa.Column('id_new', postgresql.UUID(as_uuid=True), server_default=sa.text('gen_random_uuid()'), nullable=False)
+    )
+    _swap_primary_key('closed_lots', 'id_new')
+    op.alter_column('closed_lots', 'id', server_default=None)
+
+    op.add_column(
+        'normalized_trades',
+        sa.Column('id_new', postgresql.UUID(as_uuid=True), server_default=sa.text('gen_random_uuid()'), nullable=False)
+    )
+    op.add_column('closed_lots', sa.Column('open_trade_id_new', postgresql.UUID(as_uuid=True), nullable=True))
+    op.add_column('closed_lots', sa.Column('close_trade_id_new', postgresql.UUID(as_uuid=True), nullable=True))
+    op.execute(
+        "UPDATE closed_lots c SET open_trade_id_new = o.id_new, close_trade_id_new = x.id_new "
+        "FROM normalized_trades o, normalized_trades x "
+        "WHERE o.id = c.open_trade_id AND x.id = c.close_trade_id"
+    )
+    op.execute(
+        "DELETE FROM closed_lots "
+        "WHERE open_trade_id_new IS NULL OR close_trade_id_new IS NULL"
+    )
+    op.drop_column('closed_lots', 'open_trade_id')
+    op.drop_column('closed_lots', 'close_trade_id')
+    op.alter_column('closed_lots', 'open_trade_id_new', new_column_name='open_trade_id', nullable=False)
+    op.alter_column('closed_lots', 'close_trade_id_new', new_column_name='close_trade_id', nullable=False)
+
+    _swap_primary_key('normalized_trades', 'id_new')
+    op.alter_column('normalized_trades', 'id', server_default=None)
@@ -0,0 +1,44 @@
+"""Create ingest_jobs table for background ingest processing
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-15 10:10:00.000000
+
+Uploads return once trades are stored; FIFO matching and metrics run in a
+background task whose progress is tracked here.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+ingest_job_status = postgresql.ENUM(
+    'processing', 'completed', 'failed', name='ingest_job_status', create_type=False
+)
+
+
+def upgrade() -> None:
+    ingest_job_status.create(op.get_bind(), checkfirst=True)
+    op.create_table(
+        'ingest_jobs',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('account_id', sa.String(length=50), nullable=True),
+        sa.Column('status', ingest_job_status, nullable=False),
+        sa.Column('message', sa.String(length=500), nullable=True),
+        sa.Column('trades_processed', sa.Integer(), nullable=False),
+        sa.Column('trades_failed', sa.Integer(), nullable=False),
+        sa.Column('lots_closed', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('ingest_jobs')
+    ingest_job_status.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,40 @@
+"""Store display-only aggregate ratios as double precision
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-15 10:20:00.000000
+
+Win rate, profit factor, averages and best/worst P&L are only ever shown
+as floats; reading them as doubles skips Decimal construction. Totals stay
+NUMERIC where cent accuracy matters.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '010'
+down_revision = '009'
+branch_labels = None
+depends_on = None
+
+# column -> original NUMERIC type
+RATIO_COLUMNS = {
+    'win_rate': sa.Numeric(precision=5, scale=4),
+    'profit_factor': sa.Numeric(precision=10, scale=2),
+    'average_gain': sa.Numeric(precision=18, scale=2),
+    'average_loss': sa.Numeric(precision=18, scale=2),
+    'best_symbol_pnl': sa.Numeric(precision=18, scale=2),
+    'worst_symbol_pnl': sa.Numeric(precision=18, scale=2),
+    'best_weekday_pnl': sa.Numeric(precision=18, scale=2),
+    'worst_weekday_pnl': sa.Numeric(precision=18, scale=2),
+}
+
+
+def upgrade() -> None:
+    for column in RATIO_COLUMNS:
+        op.alter_column('aggregates', column, type_=sa.Double())
+
+
+def downgrade() -> None:
+    for column, numeric_type in RATIO_COLUMNS.items():
+        op.alter_column('aggregates', column, type_=numeric_type)
@@ -0,0 +1,53 @@
+"""Add chart columns as INCLUDE columns on per_day_pnl indexes
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-15 10:30:00.000000
+
+The chart query reads date, daily_pnl, cumulative_pnl and lots_closed for
+one account in date order; with those columns in the index it is answered
+by an index-only scan.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '011'
+down_revision = '010'
+branch_labels = None
+depends_on = None
+
+CHART_COLUMNS = ['daily_pnl', 'cumulative_pnl', 'lots_closed']
+
+
+def upgrade() -> None:
+    op.create_index(
+        'idx_account_date_covering',
+        'per_day_pnl',
+        ['account_id', 'date'],
+        unique=True,
+        postgresql_include=CHART_COLUMNS
+    )
+    op.drop_index('idx_account_date', table_name='per_day_pnl')
+
+    op.drop_index('idx_per_day_pnl_demo', table_name='per_day_pnl')
+    op.create_index(
+        'idx_per_day_pnl_demo',
+        'per_day_pnl',
+        ['date'],
+        postgresql_where=sa.text('account_id IS NULL'),
+        postgresql_include=CHART_COLUMNS
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_per_day_pnl_demo', table_name='per_day_pnl')
+    op.create_index(
+        'idx_per_day_pnl_demo',
+        'per_day_pnl',
+        ['date'],
+        postgresql_where=sa.text('account_id IS NULL')
+    )
+
+    op.create_index('idx_account_date', 'per_day_pnl', ['account_id', 'date'], unique=True)
+    op.drop_index('idx_account_date_covering', table_name='per_day_pnl')
@@ -0,0 +1,45 @@
+"""Create processing_jobs table for background metrics reprocessing
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-15 10:40:00.000000
+
+POST /metrics/process returns immediately; the FIFO run and metrics
+refresh happen in a background task that records its result here.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '012'
+down_revision = '011'
+branch_labels = None
+depends_on = None
+
+# Created in revision 009
+ingest_job_status = postgresql.ENUM(
+    'processing', 'completed', 'failed', name='ingest_job_status', create_type=False
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        'processing_jobs',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('account_id', sa.String(length=50), nullable=True),
+        sa.Column('status', ingest_job_status, nullable=False),
+        sa.Column('message', sa.String(length=500), nullable=True),
+        sa.Column('trades_processed', sa.Integer(), nullable=True),
+        sa.Column('lots_closed', sa.Integer(), nullable=True),
+        sa.Column('daily_records', sa.Integer(), nullable=True),
+        sa.Column('total_pnl', sa.Numeric(precision=18, scale=2), nullable=True),
+        sa.Column('win_rate', sa.Double(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('processing_jobs')
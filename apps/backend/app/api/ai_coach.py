@@ -9,11 +9,9 @@ from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
+from app.api.responses import DecimalORJSONResponse
 from app.database import get_db
-from app.models.metrics import Aggregate
-from app.models.trade import ClosedLot
-from app.services.ai_coach_service import AICoachService
-from app.services.enhanced_metrics import EnhancedMetricsCalculator
+from app.services.ai_coach_service import generate_for
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -37,58 +35,15 @@ async def get_ai_insights(
     logger.info(f"AI Coach request - account_id={account_id}, timeframe={timeframe}")
     
     try:
-        # Get aggregate metrics
-        query = db.query(Aggregate)
-        if account_id:
-            query = query.filter(Aggregate.account_id == account_id)
-        else:
-            query = query.filter(Aggregate.account_id.is_(None))
+        result = await generate_for(db, account_id, timeframe)
         
-        aggregate = query.first()
-        
-        if not aggregate:
-            logger.warning("No aggregate data found for AI insights")
+        if result is None:
             raise HTTPException(
                 status_code=404,
                 detail="No trading data available for AI analysis"
             )
         
-        # Get closed lots for enhanced metrics
-        lots_query = db.query(ClosedLot)
-        if account_id:
-            lots_query = lots_query.filter(ClosedLot.account_id == account_id)
-        else:
-            lots_query = lots_query.filter(ClosedLot.account_id.is_(None))
-        
-        closed_lots = lots_query.all()
-        
-        # Calculate enhanced metrics
-        enhanced_calc = EnhancedMetricsCalculator(db, account_id)
-        enhanced_metrics = enhanced_calc.calculate_all_enhanced_metrics(closed_lots)
-        
-        # Build comprehensive metrics dict for AI service
-        metrics = {
-            # Basic metrics
-            "cumulative_pnl": float(aggregate.total_realized_pnl),
-            "total_trades": aggregate.total_trades,
-            "win_rate": float(aggregate.win_rate) * 100 if aggregate.win_rate else 0,
-            "profit_factor": float(aggregate.profit_factor) if aggregate.profit_factor else 0,
-            "avg_gain": float(aggregate.average_gain) if aggregate.average_gain else 0,
-            "avg_loss": float(aggregate.average_loss) if aggregate.average_loss else 0,
-            "best_symbol": aggregate.best_symbol or "N/A",
-            "worst_symbol": aggregate.worst_symbol or "N/A",
-            "best_weekday": aggregate.best_weekday or "N/A",
-            "worst_weekday": aggregate.worst_weekday or "N/A",
-            # Enhanced metrics
-            **enhanced_metrics
-        }
-        
-        # Generate insights using AI service
-        ai_service = AICoachService()
-        insights = ai_service.generate_insights(metrics)
-        
-        # Convert to dict for JSON response
-        return insights.model_dump()
+        return DecimalORJSONResponse(result)
     
     except HTTPException:
         raise
@@ -6,9 +6,16 @@ Endpoints:
 - GET /api/demo/chart - Get demo chart data
 - GET /api/demo/ai/coach - Get demo AI insights (placeholder)
 """
+import asyncio
 import logging
 from typing import Optional
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.api.responses import DecimalORJSONResponse
+from app.database import get_db, get_read_db
+from app.services.ai_coach_service import generate_for
+from app.services.metrics_query import fetch_metrics, fetch_chart
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -16,7 +23,8 @@ router = APIRouter()
 
 @router.get("/demo/metrics")
 async def get_demo_metrics(
-    timeframe: Optional[str] = Query("ALL", description="Timeframe filter")
+    timeframe: Optional[str] = Query("ALL", description="Timeframe filter"),
+    db: Session = Depends(get_read_db)
 ):
     """
     Get demo metrics using the pre-loaded creator CSV data.
@@ -25,68 +33,52 @@ async def get_demo_metrics(
     """
     logger.info(f"Fetching demo metrics - timeframe={timeframe}")
     
-    # Import here to avoid circular dependencies
-    from app.database import SessionLocal
-    from app.api.metrics import get_metrics
-    from fastapi import Depends
-    
-    # Create a database session
-    db = SessionLocal()
     try:
-        # Call the existing metrics endpoint with no account_id filter
-        result = await get_metrics(
-            account_id=None,
-            timeframe=timeframe,
-            db=db
-        )
-        
-        # Transform to match frontend expectations
-        return {
-            "metrics": {
-                "cumulative_pnl": result.get("total_realized_pnl") or 0,
-                "total_trades": result.get("total_trades") or 0,
-                "win_rate": result.get("win_rate") or 0,
-                "avg_gain": result.get("average_gain") or 0,
-                "avg_loss": result.get("average_loss") or 0,
-                "profit_factor": result.get("profit_factor") or 0,
-                "best_symbol": result.get("best_symbol") or "N/A",
-                "worst_symbol": result.get("worst_symbol") or "N/A",
-                "best_weekday": result.get("best_weekday") or "N/A",
-                "worst_weekday": result.get("worst_weekday") or "N/A",
-            },
-            "chart_data": []  # Will be fetched separately
-        }
-    finally:
-        db.close()
+        result = await asyncio.to_thread(fetch_metrics, db, None, timeframe)
+    except Exception as e:
+        logger.error(f"Error fetching demo metrics: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Error retrieving metrics")
+    
+    # Transform to match frontend expectations
+    return DecimalORJSONResponse({
+        "metrics": {
+            "cumulative_pnl": result.get("total_realized_pnl") or 0,
+            "total_trades": result.get("total_trades") or 0,
+            "win_rate": result.get("win_rate") or 0,
+            "avg_gain": result.get("average_gain") or 0,
+            "avg_loss": result.get("average_loss") or 0,
+            "profit_factor": result.get("profit_factor") or 0,
+            "best_symbol": result.get("best_symbol") or "N/A",
+            "worst_symbol": result.get("worst_symbol") or "N/A",
+            "best_weekday": result.get("best_weekday") or "N/A",
+            "worst_weekday": result.get("worst_weekday") or "N/A",
+        },
+        "chart_data": []  # Will be fetched separately
+    })
 
 
 @router.get("/demo/chart")
 async def get_demo_chart(
-    timeframe: Optional[str] = Query("ALL", description="Timeframe filter")
+    timeframe: Optional[str] = Query("ALL", description="Timeframe filter"),
+    db: Session = Depends(get_read_db)
 ):
     """
     Get demo chart data using the pre-loaded creator CSV data.
     """
     logger.info(f"Fetching demo chart data - timeframe={timeframe}")
     
-    from app.database import SessionLocal
-    from app.api.metrics import get_chart_data
-    
-    db = SessionLocal()
     try:
-        result = await get_chart_data(
-            account_id=None,
-            timeframe=timeframe,
-            db=db
-        )
-        return result
-    finally:
-        db.close()
+        result = await asyncio.to_thread(fetch_chart, db, None, timeframe)
+        return DecimalORJSONResponse(result)
+    except Exception as e:
+        logger.error(f"Error fetching demo chart data: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Error retrieving chart data")
 
 
 @router.get("/demo/ai/coach")
 async def get_demo_ai_insights(
-    timeframe: Optional[str] = Query("ALL", description="Timeframe filter")
+    timeframe: Optional[str] = Query("ALL", description="Timeframe filter"),
+    db: Session = Depends(get_db)
 ):
     """
     Get demo AI insights using the AI Coach service.
@@ -96,17 +88,16 @@ async def get_demo_ai_insights(
     """
     logger.info(f"Fetching demo AI insights - timeframe={timeframe}")
     
-    from app.database import SessionLocal
-    from app.api.ai_coach import get_ai_insights
-    
-    db = SessionLocal()
     try:
-        # Call the real AI coach endpoint with no account_id (demo data)
-        result = await get_ai_insights(
-            account_id=None,
-            timeframe=timeframe,
-            db=db
+        result = await generate_for(db, None, timeframe)
+    except Exception as e:
+        logger.error(f"Error generating demo AI insights: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Error generating AI insights")
+    
+    if result is None:
+        raise HTTPException(
+            status_code=404,
+            detail="No trading data available for AI analysis"
         )
-        return result
-    finally:
-        db.close()
+    
+    return DecimalORJSONResponse(result)
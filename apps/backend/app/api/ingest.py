@@ -1,28 +1,69 @@
 """
 CSV ingest API endpoints
 """
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends
+from fastapi import APIRouter, BackgroundTasks, UploadFile, File, Form, HTTPException, Depends
 from fastapi.responses import JSONResponse
-from typing import Optional
+from typing import Dict, List, Optional
+import asyncio
+import csv
+import io
 import logging
+import multiprocessing
+import os
 import uuid
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from sqlalchemy.orm import Session
 
-from app.schemas.trade import IngestRequest, IngestResponse, ValidationError
-from app.services.csv_parser import CSVParser, CSVParserError
-from app.services.fifo_engine import FIFOEngine
-from app.services.metrics_calculator import MetricsCalculator
-from app.models.trade import NormalizedTrade, ClosedLot
-from app.models.metrics import PerDayPnL, Aggregate
+from app.schemas.trade import IngestRequest, IngestResponse, IngestJobStatus, ValidationError
+from app.services.csv_parser import CSVParserError, parse_csv_bytes
+from app.services.ingest_jobs import run_fifo_and_metrics
+from app.models.ingest import IngestJob
 from app.database import get_db
 
 router = APIRouter(prefix="/ingest", tags=["ingest"])
 logger = logging.getLogger(__name__)
 
+VALID_TEMPLATES = frozenset({"webull_v1", "robinhood_v1", "unified_v1"})
+INVALID_TEMPLATE_MESSAGE = (
+    f"Invalid template. Must be one of: {', '.join(sorted(VALID_TEMPLATES))}"
+)
+MAX_UPLOAD_BYTES = 10 * 1024 * 1024
+
+# Column order for COPY into normalized_trades
+TRADE_COPY_COLUMNS = (
+    "account_id", "symbol", "side", "quantity", "price",
+    "executed_at", "notes", "created_at", "ingest_job_id",
+)
+
+# Worker processes for CSV parsing, so concurrent uploads are not serialized
+# by the GIL. Workers are spawned rather than forked so they never inherit
+# the parent's open database connections.
+_parse_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_parse_pool() -> ProcessPoolExecutor:
+    """Return the CSV parsing pool, creating it on first use"""
+    global _parse_pool
+    if _parse_pool is None:
+        _parse_pool = ProcessPoolExecutor(
+            max_workers=os.cpu_count(),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _parse_pool
+
+
+def shutdown_parse_pool() -> None:
+    """Stop the CSV parsing workers (called on application shutdown)"""
+    global _parse_pool
+    if _parse_pool is not None:
+        _parse_pool.shutdown(cancel_futures=True)
+        _parse_pool = None
+
 
 @router.post("/", response_model=IngestResponse)
 async def ingest_csv(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(..., description="CSV file to upload"),
     template: str = Form(..., description="Template type: webull_v1, robinhood_v1, or unified_v1"),
     account_id: Optional[str] = Form(None, description="Optional account identifier"),
@@ -36,6 +77,9 @@ async def ingest_csv(
     - robinhood_v1: Robinhood export format
     - unified_v1: Standardized format
     
+    Trades are stored before responding; FIFO matching and metrics are
+    calculated in the background. Poll /ingest/status/{job_id} for completion.
+    
     Returns job ID and processing status
     """
     job_id = str(uuid.uuid4())
@@ -46,16 +90,12 @@ async def ingest_csv(
     )
     
     # Validate template
-    valid_templates = ["webull_v1", "robinhood_v1", "unified_v1"]
-    if template not in valid_templates:
+    if template not in VALID_TEMPLATES:
         logger.warning(f"Invalid template: {template}")
-        raise HTTPException(
-            status_code=400,
-            detail=f"Invalid template. Must be one of: {', '.join(valid_templates)}"
-        )
+        raise HTTPException(status_code=400, detail=INVALID_TEMPLATE_MESSAGE)
     
     # Validate file type
-    if not file.filename.endswith('.csv'):
+    if not file.filename or file.filename[-4:].lower() != '.csv':
         logger.warning(f"Invalid file type: {file.filename}")
         raise HTTPException(
             status_code=400,
@@ -63,23 +103,26 @@ async def ingest_csv(
         )
     
     try:
-        # Read file content
-        content = await file.read()
-        csv_content = content.decode('utf-8')
+        # Check file size (10 MB limit) without reading the upload into memory
+        file.file.seek(0, io.SEEK_END)
+        file_size = file.file.tell()
+        file.file.seek(0)
         
-        # Check file size (10 MB limit)
-        if len(content) > 10 * 1024 * 1024:
-            logger.warning(f"File too large: {len(content)} bytes")
+        if file_size > MAX_UPLOAD_BYTES:
+            logger.warning(f"File too large: {file_size} bytes")
             raise HTTPException(
                 status_code=413,
                 detail="File size exceeds 10 MB limit"
             )
         
-        logger.info(f"File read successfully: {len(content)} bytes")
+        logger.info(f"File received: {file_size} bytes")
         
-        # Parse CSV
-        parser = CSVParser(template=template)
-        trades_data, errors = parser.parse(csv_content)
+        # Parse CSV in a worker process; uploads are capped at 10 MB, so the
+        # raw bytes are cheap to hand over
+        csv_bytes = await file.read()
+        trades_data, errors = await asyncio.get_running_loop().run_in_executor(
+            _get_parse_pool(), parse_csv_bytes, template, csv_bytes
+        )
         
         # Log results
         logger.info(
@@ -109,71 +152,22 @@ async def ingest_csv(
         # Save trades to database
         logger.info(f"Saving {len(trades_data)} trades to database")
         
-        normalized_trades = []
-        for trade_data in trades_data:
-            trade = NormalizedTrade(
-                account_id=account_id,
-                symbol=trade_data["symbol"],
-                side=trade_data["side"],
-                quantity=trade_data["quantity"],
-                price=trade_data["price"],
-                executed_at=datetime.fromisoformat(trade_data["executed_at"]),
-                notes=trade_data.get("notes"),
-                ingest_job_id=uuid.UUID(job_id)
-            )
-            normalized_trades.append(trade)
-            db.add(trade)
-        
-        db.commit()
-        logger.info(f"Saved {len(normalized_trades)} trades to database")
-        
-        # Process through FIFO engine
-        logger.info("Running FIFO matching engine")
-        fifo_engine = FIFOEngine()
-        closed_lots = fifo_engine.process_trades(normalized_trades)
-        
-        # Clear existing closed lots for this account
-        db.query(ClosedLot).filter(
-            ClosedLot.account_id == account_id if account_id else ClosedLot.account_id.is_(None)
-        ).delete()
-        
-        # Save closed lots
-        for lot in closed_lots:
-            db.add(lot)
-        db.commit()
-        logger.info(f"Saved {len(closed_lots)} closed lots")
-        
-        # Calculate and save metrics
-        logger.info("Calculating metrics")
-        calculator = MetricsCalculator(account_id=account_id)
-        daily_pnl_series = calculator.generate_daily_pnl_series(closed_lots, fill_gaps=True)
-        aggregate = calculator.calculate_aggregates(closed_lots, daily_pnl_series)
-        
-        # Clear existing metrics
-        db.query(PerDayPnL).filter(
-            PerDayPnL.account_id == account_id if account_id else PerDayPnL.account_id.is_(None)
-        ).delete()
-        db.query(Aggregate).filter(
-            Aggregate.account_id == account_id if account_id else Aggregate.account_id.is_(None)
-        ).delete()
-        
-        # Save new metrics
-        for daily_pnl in daily_pnl_series:
-            db.add(daily_pnl)
-        db.add(aggregate)
-        db.commit()
-        
-        logger.info(
-            f"Metrics calculated - Total P&L: ${aggregate.total_realized_pnl}, "
-            f"Win Rate: {aggregate.win_rate}"
+        # The COPY and commit block on the database, so keep them off the
+        # event loop
+        await asyncio.to_thread(
+            _store_trades, db, trades_data, len(errors), account_id, job_id
         )
+        logger.info(f"Saved {len(trades_data)} trades to database")
+        
+        # FIFO matching and metrics run after the response is sent;
+        # clients poll /ingest/status/{job_id}
+        background_tasks.add_task(run_fifo_and_metrics, job_id, account_id)
         
-        # Return success with any partial errors
+        # Return accepted trades with any partial errors
         return IngestResponse(
             job_id=job_id,
-            status="completed",
-            message=f"Successfully processed {len(trades_data)} trades, "
-                    f"generated {len(closed_lots)} closed lots" + 
+            status="processing",
+            message=f"Stored {len(trades_data)} trades, calculating metrics" + 
                     (f" ({len(errors)} failed)" if errors else ""),
             trades_processed=len(trades_data),
             trades_failed=len(errors),
@@ -186,6 +180,8 @@ async def ingest_csv(
             ] if errors else None
         )
         
+    except HTTPException:
+        raise
     except CSVParserError as e:
         logger.error(f"CSV parsing error - job_id={job_id}: {str(e)}")
         raise HTTPException(
@@ -210,6 +206,33 @@ async def ingest_csv(
         )
 
 
+@router.get("/status/{job_id}", response_model=IngestJobStatus)
+def get_ingest_status(job_id: str, db: Session = Depends(get_db)):
+    """
+    Get background processing status for an ingest job
+
+    A plain def so FastAPI runs the blocking DB read in its threadpool
+    instead of on the event loop; uploaders poll this twice a second.
+    """
+    try:
+        job_uuid = uuid.UUID(job_id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Ingest job not found")
+    
+    job = db.get(IngestJob, job_uuid)
+    if not job:
+        raise HTTPException(status_code=404, detail="Ingest job not found")
+    
+    return IngestJobStatus(
+        job_id=job_id,
+        status=job.status,
+        message=job.message,
+        trades_processed=job.trades_processed,
+        trades_failed=job.trades_failed,
+        lots_closed=job.lots_closed,
+    )
+
+
 @router.get("/templates")
 async def list_templates():
     """
@@ -240,3 +263,65 @@ async def list_templates():
             }
         ]
     }
+
+
+def _store_trades(
+    db: Session,
+    trades_data: List[Dict],
+    trades_failed: int,
+    account_id: Optional[str],
+    job_id: str
+) -> None:
+    """Copy the parsed trades, record the ingest job and commit both"""
+    _copy_trades(db, trades_data, account_id, job_id)
+    db.add(IngestJob(
+        id=uuid.UUID(job_id),
+        account_id=account_id,
+        status="processing",
+        trades_processed=len(trades_data),
+        trades_failed=trades_failed,
+    ))
+    db.commit()
+
+
+def _copy_trades(
+    db: Session,
+    trades_data: List[Dict],
+    account_id: Optional[str],
+    job_id: str
+) -> None:
+    """
+    Bulk load parsed trades with PostgreSQL COPY FROM STDIN.
+    
+    Runs inside the session's transaction, so the caller still controls
+    commit/rollback.
+    """
+    created_at = datetime.utcnow().isoformat()
+    
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for trade_data in trades_data:
+        # None is written as an empty unquoted field, which COPY reads as NULL.
+        # id is an identity column assigned by Postgres.
+        writer.writerow((
+            account_id,
+            trade_data["symbol"],
+            trade_data["side"],
+            trade_data["quantity"],
+            trade_data["price"],
+            trade_data["executed_at"],
+            trade_data.get("notes"),
+            created_at,
+            job_id,
+        ))
+    buffer.seek(0)
+    
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY normalized_trades ({', '.join(TRADE_COPY_COLUMNS)}) "
+            "FROM STDIN WITH (FORMAT csv)",
+            buffer
+        )
+    finally:
+        cursor.close()
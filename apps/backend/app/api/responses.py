@@ -0,0 +1,29 @@
+"""
+JSON response class shared by the API.
+
+Payloads are encoded by orjson in one pass. Decimal values (NUMERIC columns)
+are written as JSON numbers, so services can return them without float casts.
+"""
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi.responses import ORJSONResponse
+
+
+def _default(value: Any) -> Any:
+    """Encode types orjson does not handle natively"""
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+class DecimalORJSONResponse(ORJSONResponse):
+    """ORJSONResponse that also serializes Decimal values"""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            default=_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
@@ -14,6 +14,7 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str
+    DATABASE_READ_URL: Optional[str] = None  # Read replica for GET endpoints
     
     # OpenAI
     OPENAI_API_KEY: str
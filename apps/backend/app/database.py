@@ -13,13 +13,34 @@ from app.models.base import Base
 # Create engine
 engine = create_engine(
     settings.DATABASE_URL,
-    pool_pre_ping=True,
-    pool_size=5,
-    max_overflow=10,
+    # Sized for bursts of short dashboard queries across workers. Connections
+    # are recycled before server/proxy idle timeouts instead of being pinged
+    # on every checkout; a disconnect error invalidates the whole pool so the
+    # next checkout reconnects.
+    pool_pre_ping=False,
+    pool_size=20,
+    max_overflow=40,
+    pool_recycle=1800,
+    # Room for every endpoint's statement variants in the compiled SQL cache
+    query_cache_size=1200,
 )
 
-# Create session factory
+# Read-only engine for dashboard GETs. AUTOCOMMIT avoids a BEGIN/ROLLBACK per
+# request; points at a replica when DATABASE_READ_URL is set.
+read_engine = create_engine(
+    settings.DATABASE_READ_URL or settings.DATABASE_URL,
+    isolation_level="AUTOCOMMIT",
+    execution_options={"postgresql_readonly": True},
+    pool_pre_ping=False,
+    pool_size=20,
+    max_overflow=40,
+    pool_recycle=1800,
+    query_cache_size=1200,
+)
+
+# Create session factories
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autoflush=False, bind=read_engine)
 
 
 def get_db() -> Generator[Session, None, None]:
@@ -38,6 +59,25 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+def get_read_db() -> Generator[Session, None, None]:
+    """
+    Dependency for read-only GET endpoints.
+    
+    Sessions run in autocommit mode on a read-only connection, so they cannot
+    write and never open an explicit transaction.
+    
+    Usage:
+        @app.get("/endpoint")
+        def endpoint(db: Session = Depends(get_read_db)):
+            ...
+    """
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
 @contextmanager
 def get_db_context() -> Generator[Session, None, None]:
     """
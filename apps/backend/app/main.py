@@ -11,6 +11,7 @@ from dotenv import load_dotenv
 load_dotenv()
 
 from app.api import ingest, metrics, demo, ai_coach
+from app.api.responses import DecimalORJSONResponse
 
 # Configure logging
 logging.basicConfig(
@@ -26,6 +27,7 @@ async def lifespan(app: FastAPI):
     logger.info("Application starting up")
     yield
     logger.info("Application shutting down")
+    ingest.shutdown_parse_pool()
 
 
 app = FastAPI(
@@ -33,6 +35,7 @@ app = FastAPI(
     description="MVP trading analytics platform with FIFO P&L calculations and AI insights",
     version="0.1.0",
     lifespan=lifespan,
+    default_response_class=DecimalORJSONResponse,
 )
 
 # CORS configuration
@@ -1,14 +1,18 @@
 """
 Database models
 """
-from app.models.base import Base
+from app.models.base import Base, account_filter
 from app.models.trade import NormalizedTrade, ClosedLot
 from app.models.metrics import PerDayPnL, Aggregate
+from app.models.ingest import IngestJob, ProcessingJob
 
 __all__ = [
     "Base",
+    "account_filter",
     "NormalizedTrade",
     "ClosedLot",
     "PerDayPnL",
     "Aggregate",
+    "IngestJob",
+    "ProcessingJob",
 ]
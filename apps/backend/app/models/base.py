@@ -1,6 +1,19 @@
 """
-Database base model - will be expanded in Epic C
+Database base model and shared query helpers
 """
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
+
+
+def account_filter(model, account_id):
+    """
+    WHERE clause selecting one account's rows from a model with account_id.
+
+    The default/demo account is stored as NULL. This compiles to
+    `account_id = :param` or `account_id IS NULL` rather than IS NOT DISTINCT
+    FROM, which Postgres cannot match to the (account_id, ...) indexes.
+    """
+    if account_id:
+        return model.account_id == account_id
+    return model.account_id.is_(None)
@@ -0,0 +1,67 @@
+"""
+Job models for tracking background processing of uploads and reprocessing
+"""
+from sqlalchemy import Column, String, Integer, Numeric, Double, DateTime, Enum
+from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime
+import uuid
+
+from app.models.base import Base
+
+# Shared by ingest and processing jobs
+INGEST_JOB_STATUS = Enum("processing", "completed", "failed", name="ingest_job_status")
+
+
+class IngestJob(Base):
+    """
+    One row per CSV upload.
+    Trades are stored synchronously; FIFO matching and metrics run in the
+    background and report back through status.
+    """
+    __tablename__ = "ingest_jobs"
+    
+    # Same value as normalized_trades.ingest_job_id
+    id = Column(UUID(as_uuid=True), primary_key=True)
+    account_id = Column(String(50), nullable=True)
+    status = Column(INGEST_JOB_STATUS, nullable=False, default="processing")
+    message = Column(String(500), nullable=True)
+    
+    # Results
+    trades_processed = Column(Integer, nullable=False, default=0)
+    trades_failed = Column(Integer, nullable=False, default=0)
+    lots_closed = Column(Integer, nullable=True)
+    
+    # Metadata
+    created_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
+    updated_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<IngestJob {self.id} {self.status}>"
+
+
+class ProcessingJob(Base):
+    """
+    One row per /metrics/process request.
+    FIFO matching and the metrics refresh run in the background; results
+    are stored here for polling from any worker.
+    """
+    __tablename__ = "processing_jobs"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    account_id = Column(String(50), nullable=True)
+    status = Column(INGEST_JOB_STATUS, nullable=False, default="processing")
+    message = Column(String(500), nullable=True)
+    
+    # Results
+    trades_processed = Column(Integer, nullable=True)
+    lots_closed = Column(Integer, nullable=True)
+    daily_records = Column(Integer, nullable=True)
+    total_pnl = Column(Numeric(precision=18, scale=2), nullable=True)
+    win_rate = Column(Double, nullable=True)
+    
+    # Metadata
+    created_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
+    updated_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<ProcessingJob {self.id} {self.status}>"
@@ -1,13 +1,19 @@
 """
 Metrics models for daily P&L and aggregates
 """
-from sqlalchemy import Column, String, Numeric, Date, DateTime, Integer, Index, Boolean
+from sqlalchemy import Column, String, Text, Enum, Numeric, Double, Date, DateTime, Integer, Index, Boolean, text
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
 from datetime import datetime
 
 from app.models.base import Base
 
+# Day names as produced by MetricsCalculator
+WEEKDAY = Enum(
+    "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday",
+    name="weekday_name"
+)
+
 
 class PerDayPnL(Base):
     """
@@ -18,7 +24,7 @@ class PerDayPnL(Base):
     __tablename__ = "per_day_pnl"
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    account_id = Column(String(50), nullable=True, index=True)
+    account_id = Column(String(50), nullable=True)
     
     # Calendar date (EST)
     date = Column(Date, nullable=False, index=True)
@@ -38,7 +44,17 @@ class PerDayPnL(Base):
     
     # Composite indexes
     __table_args__ = (
-        Index('idx_account_date', 'account_id', 'date', unique=True),
+        # Covers the chart query so it runs as an index-only scan
+        Index(
+            'idx_account_date_covering', 'account_id', 'date', unique=True,
+            postgresql_include=['daily_pnl', 'cumulative_pnl', 'lots_closed']
+        ),
+        # Demo data is stored without an account
+        Index(
+            'idx_per_day_pnl_demo', 'date',
+            postgresql_where=text('account_id IS NULL'),
+            postgresql_include=['daily_pnl', 'cumulative_pnl', 'lots_closed']
+        ),
     )
     
     def __repr__(self):
@@ -66,22 +82,22 @@ class Aggregate(Base):
     total_gains = Column(Numeric(precision=18, scale=2), nullable=False, default=0)
     total_losses = Column(Numeric(precision=18, scale=2), nullable=False, default=0)
     
-    # Calculated ratios
-    win_rate = Column(Numeric(precision=5, scale=4), nullable=True)  # 0.0 to 1.0
-    profit_factor = Column(Numeric(precision=10, scale=2), nullable=True)  # gains / abs(losses)
-    average_gain = Column(Numeric(precision=18, scale=2), nullable=True)
-    average_loss = Column(Numeric(precision=18, scale=2), nullable=True)
+    # Calculated ratios (display-only, stored as doubles; totals stay NUMERIC)
+    win_rate = Column(Double, nullable=True)  # 0.0 to 1.0
+    profit_factor = Column(Double, nullable=True)  # gains / abs(losses)
+    average_gain = Column(Double, nullable=True)
+    average_loss = Column(Double, nullable=True)
     
     # Best/Worst performance
-    best_symbol = Column(String(10), nullable=True)
-    best_symbol_pnl = Column(Numeric(precision=18, scale=2), nullable=True)
-    worst_symbol = Column(String(10), nullable=True)
-    worst_symbol_pnl = Column(Numeric(precision=18, scale=2), nullable=True)
-    
-    best_weekday = Column(String(10), nullable=True)  # Monday, Tuesday, etc.
-    best_weekday_pnl = Column(Numeric(precision=18, scale=2), nullable=True)
-    worst_weekday = Column(String(10), nullable=True)
-    worst_weekday_pnl = Column(Numeric(precision=18, scale=2), nullable=True)
+    best_symbol = Column(Text, nullable=True)
+    best_symbol_pnl = Column(Double, nullable=True)
+    worst_symbol = Column(Text, nullable=True)
+    worst_symbol_pnl = Column(Double, nullable=True)
+    
+    best_weekday = Column(WEEKDAY, nullable=True)
+    best_weekday_pnl = Column(Double, nullable=True)
+    worst_weekday = Column(WEEKDAY, nullable=True)
+    worst_weekday_pnl = Column(Double, nullable=True)
     
     # Date range
     first_trade_date = Column(Date, nullable=True)
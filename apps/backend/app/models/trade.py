@@ -1,13 +1,19 @@
 """
 Trade models for normalized trades and closed lots
 """
-from sqlalchemy import Column, String, Numeric, DateTime, Integer, Index
+from sqlalchemy import (
+    Column, BigInteger, Identity, String, Text, Enum, Numeric, Date, DateTime, Integer,
+    SmallInteger, Index, Computed, text
+)
 from sqlalchemy.dialects.postgresql import UUID
-import uuid
 from datetime import datetime
 
 from app.models.base import Base
 
+# Low-cardinality columns are stored as Postgres ENUMs (4 bytes, no length check)
+TRADE_SIDE = Enum("BUY", "SELL", name="trade_side")
+POSITION_TYPE = Enum("LONG", "SHORT", name="position_type")
+
 
 class NormalizedTrade(Base):
     """
@@ -16,10 +22,11 @@ class NormalizedTrade(Base):
     """
     __tablename__ = "normalized_trades"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    account_id = Column(String(50), nullable=True, index=True)
-    symbol = Column(String(10), nullable=False, index=True)
-    side = Column(String(10), nullable=False)  # BUY or SELL
+    # Monotonic identity keeps PK index inserts append-only during bulk ingest
+    id = Column(BigInteger, Identity(always=True), primary_key=True)
+    account_id = Column(String(50), nullable=True)
+    symbol = Column(Text, nullable=False)
+    side = Column(TRADE_SIDE, nullable=False)
     quantity = Column(Numeric(precision=18, scale=8), nullable=False)
     price = Column(Numeric(precision=18, scale=2), nullable=False)
     executed_at = Column(DateTime(timezone=True), nullable=False, index=True)
@@ -32,7 +39,7 @@ class NormalizedTrade(Base):
     # Composite indexes for common queries
     __table_args__ = (
         Index('idx_symbol_executed_at', 'symbol', 'executed_at'),
-        Index('idx_account_symbol', 'account_id', 'symbol'),
+        Index('idx_account_symbol_executed_at', 'account_id', 'symbol', 'executed_at'),
     )
     
     def __repr__(self):
@@ -47,24 +54,37 @@ class ClosedLot(Base):
     """
     __tablename__ = "closed_lots"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    account_id = Column(String(50), nullable=True, index=True)
-    symbol = Column(String(10), nullable=False, index=True)
+    id = Column(BigInteger, Identity(always=True), primary_key=True)
+    account_id = Column(String(50), nullable=True)
+    symbol = Column(Text, nullable=False)
     
     # Position type
-    position_type = Column(String(10), nullable=False)  # LONG or SHORT
+    position_type = Column(POSITION_TYPE, nullable=False)
     
     # Opening trade (BUY for long, SELL for short)
-    open_trade_id = Column(UUID(as_uuid=True), nullable=False)
+    open_trade_id = Column(BigInteger, nullable=False)
     open_quantity = Column(Numeric(precision=18, scale=8), nullable=False)
     open_price = Column(Numeric(precision=18, scale=2), nullable=False)
     open_executed_at = Column(DateTime(timezone=True), nullable=False, index=True)
     
     # Closing trade (SELL for long, BUY for short)
-    close_trade_id = Column(UUID(as_uuid=True), nullable=False)
+    close_trade_id = Column(BigInteger, nullable=False)
     close_quantity = Column(Numeric(precision=18, scale=8), nullable=False)
     close_price = Column(Numeric(precision=18, scale=2), nullable=False)
-    close_executed_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    close_executed_at = Column(DateTime(timezone=True), nullable=False)
+    
+    # Close date/weekday in EST, maintained by Postgres (weekday: 0=Sunday)
+    close_date = Column(
+        Date,
+        Computed("(close_executed_at AT TIME ZONE 'America/New_York')::date", persisted=True)
+    )
+    close_weekday = Column(
+        SmallInteger,
+        Computed(
+            "EXTRACT(DOW FROM close_executed_at AT TIME ZONE 'America/New_York')::smallint",
+            persisted=True
+        )
+    )
     
     # Realized P&L (USD)
     # For LONG: (close_price - open_price) * quantity
@@ -77,7 +97,20 @@ class ClosedLot(Base):
     # Composite indexes
     __table_args__ = (
         Index('idx_symbol_close_date', 'symbol', 'close_executed_at'),
-        Index('idx_account_close_date', 'account_id', 'close_executed_at'),
+        Index(
+            'idx_account_close_date', 'account_id', 'close_executed_at',
+            postgresql_include=['realized_pnl', 'symbol']
+        ),
+        # Demo data is stored without an account
+        Index(
+            'idx_closed_lots_demo', 'close_executed_at',
+            postgresql_where=text('account_id IS NULL')
+        ),
+        Index(
+            'idx_closed_lots_brin_close', 'close_executed_at',
+            postgresql_using='brin',
+            postgresql_with={'pages_per_range': 32}
+        ),
     )
     
     def __repr__(self):
@@ -2,11 +2,17 @@
 Trade data schemas for validation and serialization
 """
 from pydantic import BaseModel, Field, field_validator
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Optional, Literal
 from decimal import Decimal
 import re
 
+# 1-5 uppercase letters, optionally followed by hyphen and letter (e.g. BRK-B)
+SYMBOL_RE = re.compile(r"[A-Z]{1,5}(?:-[A-Z])?")
+
+# Oldest accepted execution time, relative to now
+MAX_TRADE_AGE = timedelta(days=3650)
+
 
 class TradeBase(BaseModel):
     """Base trade schema with common fields"""
@@ -23,7 +29,7 @@ class TradeBase(BaseModel):
     def validate_symbol(cls, v: str) -> str:
         """Validate symbol format"""
         v = v.upper().strip()
-        if not re.match(r"^[A-Z]{1,5}(-[A-Z])?$", v):
+        if not SYMBOL_RE.fullmatch(v):
             raise ValueError(
                 f"Invalid symbol format: {v}. Must be 1-5 uppercase letters, "
                 "optionally followed by hyphen and letter (e.g., AAPL, BRK-B)"
@@ -34,12 +40,12 @@ class TradeBase(BaseModel):
     @classmethod
     def validate_executed_at(cls, v: datetime) -> datetime:
         """Validate execution timestamp"""
-        if v > datetime.now(v.tzinfo):
+        now = datetime.now(v.tzinfo)
+        if v > now:
             raise ValueError("Execution time cannot be in the future")
         
         # Check if within last 10 years
-        ten_years_ago = datetime.now(v.tzinfo).replace(year=datetime.now().year - 10)
-        if v < ten_years_ago:
+        if v < now - MAX_TRADE_AGE:
             raise ValueError("Execution time must be within last 10 years")
         
         return v
@@ -113,3 +119,13 @@ class IngestResponse(BaseModel):
                 "trades_failed": 0
             }
         }
+
+
+class IngestJobStatus(BaseModel):
+    """Schema for ingest job status response"""
+    job_id: str
+    status: Literal["processing", "completed", "failed"]
+    message: Optional[str] = None
+    trades_processed: int = 0
+    trades_failed: int = 0
+    lots_closed: Optional[int] = None
@@ -4,15 +4,221 @@ AI Coach Service - OpenAI integration for generating trading insights.
 Uses OpenAI JSON mode to generate deterministic insights based on trading metrics.
 Includes retry logic and fallback responses per PRD requirements.
 """
+import asyncio
+import hashlib
 import logging
-import json
 import os
-from typing import Dict, Any, Optional
-from openai import OpenAI
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Set, Tuple
+import orjson
+from openai import AsyncOpenAI
 from pydantic import BaseModel, ValidationError
+from sqlalchemy.orm import Session
+
+from app.models.base import account_filter
+from app.models.metrics import Aggregate
+from app.services.enhanced_metrics import EnhancedMetricsCalculator
 
 logger = logging.getLogger(__name__)
 
+# Insights keyed by (account_id, aggregate.updated_at). Metrics only change
+# when trades are reprocessed, and every refresh bumps updated_at (see
+# metrics_refresh._sync_aggregate), so entries never go stale.
+# Only model responses are stored; fallbacks are rebuilt on every request.
+_INSIGHTS_CACHE: "OrderedDict[Tuple[Optional[str], datetime], Dict[str, Any]]" = OrderedDict()
+_INSIGHTS_CACHE_SIZE = 128
+
+# Validated responses keyed by a digest of the prompt inputs, with the
+# monotonic time they expire. Fallback responses are never cached.
+_RESPONSE_CACHE: "OrderedDict[bytes, Tuple[float, AICoachResponse]]" = OrderedDict()
+_RESPONSE_CACHE_SIZE = 1024
+_RESPONSE_CACHE_TTL = 300
+
+# Concurrent insight requests are coalesced into one completion: a batch is
+# sent once it holds _BATCH_MAX_SIZE prompts or _BATCH_MAX_WAIT seconds pass
+_BATCH_MAX_SIZE = 8
+_BATCH_MAX_WAIT = 0.05
+# Typical responses use ~700 output tokens; the cap bounds worst-case latency
+_MAX_TOKENS_PER_RESPONSE = 900
+
+# Accounts with fewer closed trades than this use the lighter model
+_LIGHT_MODEL_MAX_TRADES = 20
+
+_SYSTEM_MESSAGE = (
+    "You are a trading performance analyst. Analyze trading metrics and provide "
+    "educational insights about patterns and risks. NEVER provide specific ticker "
+    "recommendations or trade calls. Focus on behavioral patterns, risk management, "
+    "and general trading discipline observations."
+)
+
+# JSON schema for response_format; mirrors AICoachResponse
+_RESPONSE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "summary": {"type": "string"},
+        "pattern_insights": {
+            "type": "array",
+            "maxItems": 3,
+            "items": {
+                "type": "object",
+                "properties": {
+                    "title": {"type": "string"},
+                    "evidence_metric": {"type": "string"},
+                    "why_it_matters": {"type": "string"}
+                },
+                "required": ["title", "evidence_metric", "why_it_matters"],
+                "additionalProperties": False
+            }
+        },
+        "risk_notes": {
+            "type": "array",
+            "maxItems": 3,
+            "items": {
+                "type": "object",
+                "properties": {
+                    "title": {"type": "string"},
+                    "trigger_condition": {"type": "string"},
+                    "mitigation_tip": {"type": "string"}
+                },
+                "required": ["title", "trigger_condition", "mitigation_tip"],
+                "additionalProperties": False
+            }
+        },
+        "top_actions": {
+            "type": "array",
+            "maxItems": 4,
+            "items": {
+                "type": "object",
+                "properties": {
+                    "priority": {"type": "integer"},
+                    "action": {"type": "string"}
+                },
+                "required": ["priority", "action"],
+                "additionalProperties": False
+            }
+        }
+    },
+    "required": ["summary", "pattern_insights", "risk_notes", "top_actions"],
+    "additionalProperties": False
+}
+
+# Static parts of every request body, built once
+_SYSTEM_CHAT_MESSAGE = {
+    "role": "system",
+    "content": _SYSTEM_MESSAGE
+}
+
+_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "trading_insights",
+        "strict": True,
+        "schema": _RESPONSE_SCHEMA
+    }
+}
+
+# Defaults for metrics missing from the prompt input
+_PROMPT_DEFAULTS: Dict[str, Any] = {
+    "cumulative_pnl": 0,
+    "win_rate": 0,
+    "profit_factor": 0,
+    "total_trades": 0,
+    "avg_gain": 0,
+    "avg_loss": 0,
+    "best_symbol": "N/A",
+    "worst_symbol": "N/A",
+    "best_weekday": "N/A",
+    "worst_weekday": "N/A",
+    # Enhanced metrics
+    "avg_holding_time_minutes": 0,
+    "avg_holding_time_winners": 0,
+    "avg_holding_time_losers": 0,
+    "quick_flip_rate": 0,
+    "top_3_symbols": [],
+    "concentration_ratio": 0,
+    "leveraged_etf_pct": 0,
+    "total_unique_symbols": 0,
+    "current_streak": 0,
+    "longest_win_streak": 0,
+    "longest_loss_streak": 0,
+    "best_hour": "N/A",
+    "best_hour_avg_pnl": 0,
+    "worst_hour": "N/A",
+    "worst_hour_avg_pnl": 0,
+    "best_month": "N/A",
+    "worst_month": "N/A",
+    "trades_per_day_avg": 0,
+    "avg_position_size_shares": 0,
+    "sizing_consistency_score": 0,
+    "max_drawdown": 0,
+    "daily_pnl_volatility": 0,
+}
+
+
+_PROMPT_TEMPLATE = """You are analyzing REAL trading data. Every number below is ACTUAL data from this trader's closed positions. Do NOT invent, estimate, or hallucinate any statistics.
+
+**ACTUAL PERFORMANCE DATA:**
+- Cumulative Realized P&L: ${cumulative_pnl:,.2f}
+- Total Closed Trades: {total_trades}
+- Win Rate: {win_rate:.1f}%
+- Profit Factor: {profit_factor:.2f}
+- Average Gain: ${avg_gain:.2f}
+- Average Loss: ${avg_loss:.2f}
+
+**ACTUAL HOLDING TIME DATA:**
+- Average Holding Time: {avg_holding_time_minutes:.0f} minutes ({avg_hold_hours:.1f} hours)
+- Winners Held: {avg_holding_time_winners:.0f} minutes ({winners_hold_hours:.1f} hours)
+- Losers Held: {avg_holding_time_losers:.0f} minutes ({losers_hold_hours:.1f} hours)
+- Quick Flip Rate: {quick_flip_pct:.1f}% (trades held < 1 hour)
+
+**ACTUAL SYMBOL CONCENTRATION:**
+- Total Unique Symbols Traded: {total_unique_symbols}
+- Top 3 Symbols: {top_3_symbols_text}
+- Top 3 Concentration: {concentration_pct:.1f}% of all trades
+- Leveraged ETF Usage: {leveraged_pct:.1f}% of trades
+
+**ACTUAL WIN/LOSS STREAKS:**
+- Current Streak: {streak_sign}{current_streak} trades
+- Longest Winning Streak: {longest_win_streak} trades
+- Longest Losing Streak: {longest_loss_streak} trades
+
+**ACTUAL TIMING PATTERNS (EST):**
+- Best Trading Hour: {best_hour} EST (avg ${best_hour_avg_pnl:.2f}/trade)
+- Worst Trading Hour: {worst_hour} EST (avg ${worst_hour_avg_pnl:.2f}/trade)
+- Best Month: {best_month}
+- Worst Month: {worst_month}
+- Best Day of Week: {best_weekday}
+- Worst Day of Week: {worst_weekday}
+- Average Trades Per Day: {trades_per_day_avg:.1f}
+- Note: Regular NYSE hours are 09:30-16:00 EST
+
+**ACTUAL POSITION SIZING:**
+- Average Position Size: {avg_position_size_shares:.0f} shares
+- Sizing Consistency Score: {sizing_consistency_score:.2f} (0=inconsistent, 1=very consistent)
+
+**ACTUAL RISK METRICS:**
+- Maximum Drawdown: ${max_drawdown:,.2f} (largest loss from peak P&L)
+- Daily P&L Volatility: ${daily_pnl_volatility:.2f} (standard deviation of daily P&L)
+- Best Performing Symbol: {best_symbol}
+- Worst Performing Symbol: {worst_symbol}
+
+**STRICT INSTRUCTIONS:**
+1. ONLY reference the EXACT numbers provided above - do NOT make up statistics
+2. When mentioning hours, note if they fall outside regular NYSE hours (09:30-16:00 EST)
+3. Provide 2-3 pattern insights using ONLY the data above
+4. Provide 2-3 risk notes with specific thresholds from the data
+5. Provide 3-4 actionable recommendations based on the ACTUAL patterns observed
+
+**ABSOLUTE RULES:**
+- NO ticker buy/sell recommendations
+- NO invented statistics or percentages
+- ONLY use numbers explicitly shown above
+- If best/worst hour is outside 09:30-16:00 EST, mention this as extended hours trading
+- Quote exact metrics in your evidence (e.g., "Your win rate of 55.9%..." not "Your win rate is around 56%")
+- Identify ONE biggest strength and ONE biggest weakness from the data"""
+
 
 class PatternInsight(BaseModel):
     title: str
@@ -38,6 +244,229 @@ class AICoachResponse(BaseModel):
     top_actions: list[TopAction]
 
 
+class _BatchedResponse(BaseModel):
+    """Response for a batched completion, one entry per prompt."""
+    results: list[AICoachResponse]
+
+
+_BATCH_RESPONSE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "results": {
+            "type": "array",
+            "items": _RESPONSE_SCHEMA
+        }
+    },
+    "required": ["results"],
+    "additionalProperties": False
+}
+
+_BATCH_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "trading_insights_batch",
+        "strict": True,
+        "schema": _BATCH_RESPONSE_SCHEMA
+    }
+}
+
+_BATCH_PROMPT_HEADER = """Each of the {count} sections below describes a DIFFERENT trader. Analyze every section independently, following its instructions and using ONLY the data in that section.
+
+Return "results" with exactly {count} entries, one per section, in section order."""
+
+
+async def _complete(
+    client: AsyncOpenAI,
+    model: str,
+    prompt: str,
+    response_format: Dict[str, Any],
+    max_tokens: int
+) -> str:
+    """
+    Stream one JSON-schema chat completion and return the assembled text.
+    
+    Tokens are consumed as they arrive; strict-schema validation is left to
+    the caller and only ever sees the complete text.
+    """
+    stream = await client.chat.completions.create(
+        model=model,
+        messages=[
+            _SYSTEM_CHAT_MESSAGE,
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ],
+        response_format=response_format,
+        temperature=0.7,
+        max_tokens=max_tokens,
+        stream=True
+    )
+    
+    parts = []
+    async for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            parts.append(chunk.choices[0].delta.content)
+    
+    logger.info(f"OpenAI response received - streamed chunks: {len(parts)}")
+    
+    return "".join(parts)
+
+
+class _InsightsBatcher:
+    """
+    Micro-batches concurrent prompts into shared chat completions.
+    
+    The system message and schema are sent once per batch instead of once per
+    request. A lone prompt is sent with the single-response schema as before.
+    """
+    
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        # Strong references to in-flight dispatches; the event loop only
+        # keeps weak ones, so an unreferenced task could be collected
+        self._dispatches: Set[asyncio.Task] = set()
+    
+    async def submit(self, client: AsyncOpenAI, model: str, prompt: str) -> AICoachResponse:
+        """Queue a prompt and wait for its validated response."""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Queues and tasks belong to one event loop
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._collect(self._queue))
+        
+        future = loop.create_future()
+        self._queue.put_nowait((client, model, prompt, future))
+        return await future
+    
+    async def _collect(self, queue: asyncio.Queue) -> None:
+        """Gather queued prompts into batches and dispatch them."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + _BATCH_MAX_WAIT
+            while len(batch) < _BATCH_MAX_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            # Only prompts for the same model can share a completion
+            by_model: Dict[str, list] = {}
+            for request in batch:
+                by_model.setdefault(request[1], []).append(request)
+            for requests in by_model.values():
+                task = loop.create_task(self._dispatch(requests))
+                self._dispatches.add(task)
+                task.add_done_callback(self._dispatches.discard)
+    
+    async def _dispatch(self, requests: list) -> None:
+        """Send one completion for the requests and resolve their futures."""
+        if len(requests) == 1:
+            await self._dispatch_single(requests[0])
+            return
+        
+        client, model = requests[0][0], requests[0][1]
+        futures = [request[3] for request in requests]
+        
+        try:
+            responses = await self._complete_batch(
+                client, model, [request[2] for request in requests]
+            )
+        except Exception as e:
+            # Retry each prompt on its own so one bad batch doesn't send every
+            # caller into its retry/fallback policy at the same moment
+            logger.warning(f"Batched AI insights failed, retrying individually: {e}")
+            await asyncio.gather(*(self._dispatch_single(request) for request in requests))
+            return
+        
+        for future, response in zip(futures, responses):
+            if not future.done():
+                future.set_result(response)
+    
+    @staticmethod
+    async def _dispatch_single(request: tuple) -> None:
+        """Send one request as its own completion and resolve its future."""
+        client, model, prompt, future = request
+        
+        try:
+            response_text = await _complete(
+                client, model, prompt,
+                _RESPONSE_FORMAT, _MAX_TOKENS_PER_RESPONSE
+            )
+            response = AICoachResponse.model_validate_json(response_text)
+        except Exception as e:
+            # The caller applies its own retry/fallback policy
+            if not future.done():
+                future.set_exception(e)
+            return
+        
+        if not future.done():
+            future.set_result(response)
+    
+    @staticmethod
+    async def _complete_batch(
+        client: AsyncOpenAI,
+        model: str,
+        prompts: List[str]
+    ) -> List[AICoachResponse]:
+        """Send several prompts as numbered sections of one completion."""
+        logger.info(f"Batching {len(prompts)} AI insight requests")
+        sections = [
+            f"=== TRADER {index} ===\n{prompt}"
+            for index, prompt in enumerate(prompts, start=1)
+        ]
+        prompt = "\n\n".join(
+            [_BATCH_PROMPT_HEADER.format(count=len(prompts)), *sections]
+        )
+        
+        response_text = await _complete(
+            client, model, prompt,
+            _BATCH_RESPONSE_FORMAT,
+            _MAX_TOKENS_PER_RESPONSE * len(prompts)
+        )
+        results = _BatchedResponse.model_validate_json(response_text).results
+        if len(results) != len(prompts):
+            raise ValueError(
+                f"Batched response has {len(results)} results for {len(prompts)} prompts"
+            )
+        return results
+
+
+_batcher = _InsightsBatcher()
+
+# OpenAI client shared by all service instances, so its HTTP connection
+# pool (and keep-alive connections to the API) outlives each request
+_client: Optional[AsyncOpenAI] = None
+
+
+def _get_client(api_key: str) -> AsyncOpenAI:
+    """Return the shared OpenAI client, creating it on first use."""
+    global _client
+    if _client is None or _client.api_key != api_key:
+        _client = AsyncOpenAI(api_key=api_key)
+    return _client
+
+
+def _response_cache_key(
+    metrics: Dict[str, Any],
+    symbol_summary: Optional[Dict[str, Any]]
+) -> bytes:
+    """Digest of the prompt inputs, independent of dict ordering."""
+    canonical = orjson.dumps(
+        [metrics, symbol_summary],
+        default=str,
+        option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    )
+    return hashlib.blake2b(canonical, digest_size=16).digest()
+
+
 class AICoachService:
     """Service for generating AI coaching insights using OpenAI."""
     
@@ -47,12 +476,13 @@ class AICoachService:
             logger.warning("OPENAI_API_KEY not set - AI Coach will use fallback responses")
             self.client = None
         else:
-            self.client = OpenAI(api_key=self.api_key)
+            self.client = _get_client(self.api_key)
         
         self.model = "gpt-4o-mini"  # Using GPT-4 mini for cost efficiency
+        self.light_model = "gpt-4.1-nano"  # Small accounts (see _choose_model)
         self.max_retries = 1  # Per PRD: retry once on failure
     
-    def generate_insights(
+    async def generate_insights(
         self,
         metrics: Dict[str, Any],
         symbol_summary: Optional[Dict[str, Any]] = None
@@ -65,145 +495,98 @@ class AICoachService:
             symbol_summary: Optional symbol-level performance data
         
         Returns:
-            AICoachResponse with insights, patterns, risks, and actions
+            AICoachResponse with insights, patterns, risks, and actions;
+            the fallback response if OpenAI is unavailable or fails
+        """
+        response = await self.try_generate_insights(metrics, symbol_summary)
+        if response is None:
+            return self._get_fallback_response(metrics)
+        return response
+    
+    async def try_generate_insights(
+        self,
+        metrics: Dict[str, Any],
+        symbol_summary: Optional[Dict[str, Any]] = None
+    ) -> Optional[AICoachResponse]:
+        """
+        Generate AI insights, without falling back on failure.
+        
+        Args:
+            metrics: Aggregate trading metrics (P&L, win rate, etc.)
+            symbol_summary: Optional symbol-level performance data
+        
+        Returns:
+            Validated model response, or None if there is no OpenAI client or
+            every attempt failed (callers decide whether to use the fallback)
         """
         logger.info("Generating AI insights")
         
-        # If no OpenAI client, return fallback immediately
+        # If no OpenAI client, there is no model response to return
         if not self.client:
-            logger.warning("No OpenAI client - returning fallback response")
-            return self._get_fallback_response(metrics)
+            logger.warning("No OpenAI client - no model response available")
+            return None
+        
+        cache_key = _response_cache_key(metrics, symbol_summary)
+        cached = _RESPONSE_CACHE.get(cache_key)
+        if cached is not None and cached[0] > time.monotonic():
+            _RESPONSE_CACHE.move_to_end(cache_key)
+            logger.info("Returning cached AI response for identical metrics")
+            return cached[1]
         
         # Try to get OpenAI response with retry
         for attempt in range(self.max_retries + 1):
             try:
                 logger.info(f"OpenAI attempt {attempt + 1}/{self.max_retries + 1}")
-                response = self._call_openai(metrics, symbol_summary)
-                
-                # Validate response against schema
-                validated_response = AICoachResponse(**response)
+                validated_response = await self._call_openai(metrics, symbol_summary)
                 logger.info("Successfully generated and validated AI insights")
+                
+                _RESPONSE_CACHE[cache_key] = (
+                    time.monotonic() + _RESPONSE_CACHE_TTL, validated_response
+                )
+                _RESPONSE_CACHE.move_to_end(cache_key)
+                if len(_RESPONSE_CACHE) > _RESPONSE_CACHE_SIZE:
+                    _RESPONSE_CACHE.popitem(last=False)
                 return validated_response
                 
             except ValidationError as e:
                 logger.error(f"Schema validation failed on attempt {attempt + 1}: {str(e)}")
-                if attempt < self.max_retries:
-                    logger.info("Retrying OpenAI call...")
-                    continue
-                else:
-                    logger.warning("Max retries reached - returning fallback")
-                    return self._get_fallback_response(metrics)
             
             except Exception as e:
                 logger.error(f"OpenAI call failed on attempt {attempt + 1}: {str(e)}")
-                if attempt < self.max_retries:
-                    logger.info("Retrying OpenAI call...")
-                    continue
-                else:
-                    logger.warning("Max retries reached - returning fallback")
-                    return self._get_fallback_response(metrics)
+            
+            if attempt < self.max_retries:
+                logger.info("Retrying OpenAI call...")
         
-        # Should never reach here, but return fallback just in case
-        return self._get_fallback_response(metrics)
+        logger.warning("Max retries reached - no model response")
+        return None
     
-    def _call_openai(
+    async def _call_openai(
         self,
         metrics: Dict[str, Any],
         symbol_summary: Optional[Dict[str, Any]]
-    ) -> Dict[str, Any]:
+    ) -> AICoachResponse:
         """
         Call OpenAI API in JSON mode.
         
-        Per PRD: No ticker advice or recommendations allowed.
+        Per PRD: No ticker advice or recommendations allowed. The prompt may
+        share a completion with other concurrent requests (see _InsightsBatcher).
+        
+        Returns:
+            Response decoded and validated against AICoachResponse
         """
-        # Build prompt
         prompt = self._build_prompt(metrics, symbol_summary)
+        return await _batcher.submit(self.client, self._choose_model(metrics), prompt)
+    
+    def _choose_model(self, metrics: Dict[str, Any]) -> str:
+        """
+        Route small accounts to the lighter model.
         
-        # Define JSON schema for response_format
-        response_schema = {
-            "type": "object",
-            "properties": {
-                "summary": {"type": "string"},
-                "pattern_insights": {
-                    "type": "array",
-                    "items": {
-                        "type": "object",
-                        "properties": {
-                            "title": {"type": "string"},
-                            "evidence_metric": {"type": "string"},
-                            "why_it_matters": {"type": "string"}
-                        },
-                        "required": ["title", "evidence_metric", "why_it_matters"],
-                        "additionalProperties": False
-                    }
-                },
-                "risk_notes": {
-                    "type": "array",
-                    "items": {
-                        "type": "object",
-                        "properties": {
-                            "title": {"type": "string"},
-                            "trigger_condition": {"type": "string"},
-                            "mitigation_tip": {"type": "string"}
-                        },
-                        "required": ["title", "trigger_condition", "mitigation_tip"],
-                        "additionalProperties": False
-                    }
-                },
-                "top_actions": {
-                    "type": "array",
-                    "items": {
-                        "type": "object",
-                        "properties": {
-                            "priority": {"type": "integer"},
-                            "action": {"type": "string"}
-                        },
-                        "required": ["priority", "action"],
-                        "additionalProperties": False
-                    }
-                }
-            },
-            "required": ["summary", "pattern_insights", "risk_notes", "top_actions"],
-            "additionalProperties": False
-        }
-        
-        # Call OpenAI with JSON mode
-        completion = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {
-                    "role": "system",
-                    "content": (
-                        "You are a trading performance analyst. Analyze trading metrics and provide "
-                        "educational insights about patterns and risks. NEVER provide specific ticker "
-                        "recommendations or trade calls. Focus on behavioral patterns, risk management, "
-                        "and general trading discipline observations."
-                    )
-                },
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
-            response_format={
-                "type": "json_schema",
-                "json_schema": {
-                    "name": "trading_insights",
-                    "strict": True,
-                    "schema": response_schema
-                }
-            },
-            temperature=0.7,
-            max_tokens=1500
-        )
-        
-        # Parse JSON response
-        response_text = completion.choices[0].message.content
-        response_data = json.loads(response_text)
-        
-        logger.info(f"OpenAI response received - tokens used: {completion.usage.total_tokens}")
-        
-        return response_data
+        With only a handful of closed trades most enhanced metrics are near
+        their defaults, so the cheaper model produces comparable insights.
+        """
+        if (metrics.get("total_trades") or 0) < _LIGHT_MODEL_MAX_TRADES:
+            return self.light_model
+        return self.model
     
     def _build_prompt(
         self,
@@ -211,112 +594,24 @@ class AICoachService:
         symbol_summary: Optional[Dict[str, Any]]
     ) -> str:
         """Build the prompt for OpenAI based on metrics."""
+        # One merge fills every metric the template references
+        values = {**_PROMPT_DEFAULTS, **metrics}
         
-        # Extract all metrics
-        cumulative_pnl = metrics.get('cumulative_pnl', 0)
-        win_rate = metrics.get('win_rate', 0)
-        profit_factor = metrics.get('profit_factor', 0)
-        total_trades = metrics.get('total_trades', 0)
-        avg_gain = metrics.get('avg_gain', 0)
-        avg_loss = metrics.get('avg_loss', 0)
-        best_symbol = metrics.get('best_symbol', 'N/A')
-        worst_symbol = metrics.get('worst_symbol', 'N/A')
-        best_weekday = metrics.get('best_weekday', 'N/A')
-        worst_weekday = metrics.get('worst_weekday', 'N/A')
-        
-        # Enhanced metrics
-        avg_hold_time = metrics.get('avg_holding_time_minutes', 0)
-        avg_hold_winners = metrics.get('avg_holding_time_winners', 0)
-        avg_hold_losers = metrics.get('avg_holding_time_losers', 0)
-        quick_flip_rate = metrics.get('quick_flip_rate', 0)
-        
-        top_3_symbols = metrics.get('top_3_symbols', [])
-        concentration_ratio = metrics.get('concentration_ratio', 0)
-        leveraged_pct = metrics.get('leveraged_etf_pct', 0)
-        unique_symbols = metrics.get('total_unique_symbols', 0)
-        
-        current_streak = metrics.get('current_streak', 0)
-        longest_win_streak = metrics.get('longest_win_streak', 0)
-        longest_loss_streak = metrics.get('longest_loss_streak', 0)
-        
-        best_hour = metrics.get('best_hour', 'N/A')
-        best_hour_pnl = metrics.get('best_hour_avg_pnl', 0)
-        worst_hour = metrics.get('worst_hour', 'N/A')
-        worst_hour_pnl = metrics.get('worst_hour_avg_pnl', 0)
-        best_month = metrics.get('best_month', 'N/A')
-        worst_month = metrics.get('worst_month', 'N/A')
-        trades_per_day = metrics.get('trades_per_day_avg', 0)
-        
-        avg_position_size = metrics.get('avg_position_size_shares', 0)
-        sizing_consistency = metrics.get('sizing_consistency_score', 0)
-        
-        max_drawdown = metrics.get('max_drawdown', 0)
-        volatility = metrics.get('daily_pnl_volatility', 0)
-        
-        # Build comprehensive prompt
-        prompt = f"""You are analyzing REAL trading data. Every number below is ACTUAL data from this trader's closed positions. Do NOT invent, estimate, or hallucinate any statistics.
-
-**ACTUAL PERFORMANCE DATA:**
-- Cumulative Realized P&L: ${cumulative_pnl:,.2f}
-- Total Closed Trades: {total_trades}
-- Win Rate: {win_rate:.1f}%
-- Profit Factor: {profit_factor:.2f}
-- Average Gain: ${avg_gain:.2f}
-- Average Loss: ${avg_loss:.2f}
-
-**ACTUAL HOLDING TIME DATA:**
-- Average Holding Time: {avg_hold_time:.0f} minutes ({avg_hold_time/60:.1f} hours)
-- Winners Held: {avg_hold_winners:.0f} minutes ({avg_hold_winners/60:.1f} hours)
-- Losers Held: {avg_hold_losers:.0f} minutes ({avg_hold_losers/60:.1f} hours)
-- Quick Flip Rate: {quick_flip_rate*100:.1f}% (trades held < 1 hour)
-
-**ACTUAL SYMBOL CONCENTRATION:**
-- Total Unique Symbols Traded: {unique_symbols}
-- Top 3 Symbols: {', '.join(top_3_symbols[:3]) if top_3_symbols else 'N/A'}
-- Top 3 Concentration: {concentration_ratio*100:.1f}% of all trades
-- Leveraged ETF Usage: {leveraged_pct*100:.1f}% of trades
-
-**ACTUAL WIN/LOSS STREAKS:**
-- Current Streak: {"+" if current_streak > 0 else ""}{current_streak} trades
-- Longest Winning Streak: {longest_win_streak} trades
-- Longest Losing Streak: {longest_loss_streak} trades
-
-**ACTUAL TIMING PATTERNS (EST):**
-- Best Trading Hour: {best_hour} EST (avg ${best_hour_pnl:.2f}/trade)
-- Worst Trading Hour: {worst_hour} EST (avg ${worst_hour_pnl:.2f}/trade)
-- Best Month: {best_month}
-- Worst Month: {worst_month}
-- Best Day of Week: {best_weekday}
-- Worst Day of Week: {worst_weekday}
-- Average Trades Per Day: {trades_per_day:.1f}
-- Note: Regular NYSE hours are 09:30-16:00 EST
-
-**ACTUAL POSITION SIZING:**
-- Average Position Size: {avg_position_size:.0f} shares
-- Sizing Consistency Score: {sizing_consistency:.2f} (0=inconsistent, 1=very consistent)
-
-**ACTUAL RISK METRICS:**
-- Maximum Drawdown: ${max_drawdown:,.2f} (largest loss from peak P&L)
-- Daily P&L Volatility: ${volatility:.2f} (standard deviation of daily P&L)
-- Best Performing Symbol: {best_symbol}
-- Worst Performing Symbol: {worst_symbol}
-
-**STRICT INSTRUCTIONS:**
-1. ONLY reference the EXACT numbers provided above - do NOT make up statistics
-2. When mentioning hours, note if they fall outside regular NYSE hours (09:30-16:00 EST)
-3. Provide 2-3 pattern insights using ONLY the data above
-4. Provide 2-3 risk notes with specific thresholds from the data
-5. Provide 3-4 actionable recommendations based on the ACTUAL patterns observed
-
-**ABSOLUTE RULES:**
-- NO ticker buy/sell recommendations
-- NO invented statistics or percentages
-- ONLY use numbers explicitly shown above
-- If best/worst hour is outside 09:30-16:00 EST, mention this as extended hours trading
-- Quote exact metrics in your evidence (e.g., "Your win rate of 55.9%..." not "Your win rate is around 56%")
-- Identify ONE biggest strength and ONE biggest weakness from the data"""
+        # Values the template cannot derive with a format spec
+        top_3_symbols = values["top_3_symbols"]
+        current_streak = values["current_streak"]
+        values.update(
+            avg_hold_hours=values["avg_holding_time_minutes"] / 60,
+            winners_hold_hours=values["avg_holding_time_winners"] / 60,
+            losers_hold_hours=values["avg_holding_time_losers"] / 60,
+            quick_flip_pct=values["quick_flip_rate"] * 100,
+            top_3_symbols_text=', '.join(top_3_symbols[:3]) if top_3_symbols else 'N/A',
+            concentration_pct=values["concentration_ratio"] * 100,
+            leveraged_pct=values["leveraged_etf_pct"] * 100,
+            streak_sign="+" if current_streak > 0 else "",
+        )
         
-        return prompt
+        return _PROMPT_TEMPLATE.format_map(values)
     
     def _get_fallback_response(self, metrics: Dict[str, Any]) -> AICoachResponse:
         """
@@ -384,3 +679,77 @@ class AICoachService:
             risk_notes=risk_notes,
             top_actions=top_actions
         )
+
+
+async def generate_for(
+    db: Session,
+    account_id: Optional[str],
+    timeframe: Optional[str] = "ALL"
+) -> Optional[Dict[str, Any]]:
+    """
+    Generate AI coaching insights for an account's stored metrics.
+    
+    Database reads run in a worker thread; the OpenAI call is awaited so the
+    event loop keeps serving other requests meanwhile.
+    
+    Args:
+        db: Database session
+        account_id: Account to analyze (None for the default/demo account)
+        timeframe: Requested timeframe (insights always cover all data)
+    
+    Returns:
+        Insights dict, or None if the account has no aggregate data
+    """
+    # Get aggregate metrics
+    aggregate = await asyncio.to_thread(
+        db.query(Aggregate).filter(account_filter(Aggregate, account_id)).first
+    )
+    
+    if not aggregate:
+        logger.warning("No aggregate data found for AI insights")
+        return None
+    
+    # Serve repeat requests without rescanning lots or calling OpenAI
+    cache_key = (account_id, aggregate.updated_at)
+    cached = _INSIGHTS_CACHE.get(cache_key)
+    if cached is not None:
+        _INSIGHTS_CACHE.move_to_end(cache_key)
+        logger.info("Returning cached AI insights")
+        return cached
+    
+    # Calculate enhanced metrics (loads only the lot columns it needs)
+    enhanced_calc = EnhancedMetricsCalculator(db, account_id)
+    enhanced_metrics = await asyncio.to_thread(enhanced_calc.calculate_all_enhanced_metrics)
+    
+    # Build comprehensive metrics dict for AI service
+    metrics = {
+        # Basic metrics
+        "cumulative_pnl": float(aggregate.total_realized_pnl),
+        "total_trades": aggregate.total_trades,
+        "win_rate": float(aggregate.win_rate) * 100 if aggregate.win_rate else 0,
+        "profit_factor": float(aggregate.profit_factor) if aggregate.profit_factor else 0,
+        "avg_gain": float(aggregate.average_gain) if aggregate.average_gain else 0,
+        "avg_loss": float(aggregate.average_loss) if aggregate.average_loss else 0,
+        "best_symbol": aggregate.best_symbol or "N/A",
+        "worst_symbol": aggregate.worst_symbol or "N/A",
+        "best_weekday": aggregate.best_weekday or "N/A",
+        "worst_weekday": aggregate.worst_weekday or "N/A",
+        # Enhanced metrics
+        **enhanced_metrics
+    }
+    
+    # Generate insights and convert to dict for JSON response
+    service = AICoachService()
+    insights = await service.try_generate_insights(metrics)
+    if insights is None:
+        # Fallbacks are not cached, so the next request retries OpenAI
+        logger.warning("Returning fallback AI insights")
+        return service._get_fallback_response(metrics).model_dump()
+    
+    result = insights.model_dump()
+    
+    _INSIGHTS_CACHE[cache_key] = result
+    if len(_INSIGHTS_CACHE) > _INSIGHTS_CACHE_SIZE:
+        _INSIGHTS_CACHE.popitem(last=False)
+    
+    return result
@@ -2,17 +2,25 @@
 CSV parsing service for broker templates
 Handles Webull, Robinhood, and Unified CSV formats
 """
+import re
+import numpy as np
 import pandas as pd
 import logging
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, FrozenSet, List, Tuple, Optional, TextIO
 from datetime import datetime
-from io import StringIO
-import pytz
+from io import BytesIO, StringIO, TextIOWrapper
+from zoneinfo import ZoneInfo
 
 logger = logging.getLogger(__name__)
 
 # Timezone for EST
-EST = pytz.timezone("America/New_York")
+EST = ZoneInfo("America/New_York")
+
+# Timezone abbreviations stripped from timestamps before parsing (EST is assumed)
+TZ_SUFFIX_PATTERN = re.compile(r"\s+(?:EST|EDT|PST|PDT|CST|CDT|MST|MDT)$")
+
+# Timestamps ending in an explicit UTC offset, e.g. 10:30:00-05:00 or 10:30:00Z
+UTC_OFFSET_PATTERN = re.compile(r"\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?\s*(?:Z|[+-]\d{2}:?\d{2})$")
 
 
 class CSVParserError(Exception):
@@ -52,25 +60,20 @@ class CSVParser:
         "notes": ["notes"],
     }
     
+    # Columns every template must provide
+    REQUIRED_FIELDS = ("symbol", "side", "quantity", "price", "executed_at")
+    
     # Side mappings
+    # Keys are lowercase; side values are case-folded before lookup
     SIDE_MAPPINGS = {
         "buy": "BUY",
-        "BUY": "BUY",
-        "Buy": "BUY",
-        "B": "BUY",
         "b": "BUY",
         "sell": "SELL",
-        "SELL": "SELL",
-        "Sell": "SELL",
-        "S": "SELL",
         "s": "SELL",
-        "Short": "SELL",
         "short": "SELL",
-        "Short Sell": "SELL",
         "short sell": "SELL",
-        "SELL_SHORT": "SELL",
         "sell short": "SELL",
-        "Sell Short": "SELL",
+        "sell_short": "SELL",
     }
     
     def __init__(self, template: str):
@@ -82,18 +85,20 @@ class CSVParser:
         """
         self.template = template
         self.header_map = self._get_header_map()
+        self.known_headers = frozenset().union(*self.header_map.values())
         logger.info(f"Initialized CSV parser for template: {template}")
     
-    def _get_header_map(self) -> Dict[str, List[str]]:
-        """Get header mapping for current template"""
+    def _get_header_map(self) -> Dict[str, FrozenSet[str]]:
+        """Get header mapping for current template, as sets of accepted names"""
         if self.template == "webull_v1":
-            return self.WEBULL_HEADERS
+            headers = self.WEBULL_HEADERS
         elif self.template == "robinhood_v1":
-            return self.ROBINHOOD_HEADERS
+            headers = self.ROBINHOOD_HEADERS
         elif self.template == "unified_v1":
-            return self.UNIFIED_HEADERS
+            headers = self.UNIFIED_HEADERS
         else:
             raise CSVParserError(f"Unknown template: {self.template}")
+        return {field: frozenset(names) for field, names in headers.items()}
     
     def parse(self, csv_content: str) -> Tuple[List[Dict], List[Dict]]:
         """
@@ -105,11 +110,37 @@ class CSVParser:
         Returns:
             Tuple of (successful_trades, errors)
         """
+        return self.parse_stream(StringIO(csv_content))
+    
+    def parse_stream(self, csv_stream: TextIO) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Parse CSV from a text stream and return normalized trades
+        
+        Reads the stream directly so large uploads are not first
+        materialized as a single string.
+        
+        Args:
+            csv_stream: Readable text stream positioned at the header row
+            
+        Returns:
+            Tuple of (successful_trades, errors)
+        
+        Raises:
+            CSVParserError: If the CSV cannot be read or headers are invalid
+            UnicodeDecodeError: If the stream is not valid for its encoding
+        """
         logger.info(f"Starting CSV parse with template: {self.template}")
         
         try:
-            # Read CSV
-            df = pd.read_csv(StringIO(csv_content))
+            # Read CSV with the C engine. Only template columns are loaded, and
+            # as strings: every value is validated and converted in _parse_frame,
+            # so per-column type inference would be wasted work.
+            df = pd.read_csv(
+                csv_stream,
+                engine="c",
+                usecols=lambda column: column in self.known_headers,
+                dtype=str,
+            )
             logger.info(f"Read CSV with {len(df)} rows and columns: {list(df.columns)}")
             
             # Validate headers
@@ -120,21 +151,8 @@ class CSVParser:
             # Normalize column names
             df = self._normalize_columns(df)
             
-            # Parse each row
-            trades = []
-            errors = []
-            
-            for idx, row in df.iterrows():
-                try:
-                    trade = self._parse_row(row, idx + 2)  # +2 for header and 0-index
-                    trades.append(trade)
-                except Exception as e:
-                    logger.warning(f"Error parsing row {idx + 2}: {str(e)}")
-                    errors.append({
-                        "row": idx + 2,
-                        "error": str(e),
-                        "data": row.to_dict()
-                    })
+            # Parse and validate whole columns at once
+            trades, errors = self._parse_frame(df)
             
             logger.info(f"Parsed {len(trades)} trades successfully, {len(errors)} errors")
             return trades, errors
@@ -143,34 +161,34 @@ class CSVParser:
             raise CSVParserError("CSV file is empty")
         except pd.errors.ParserError as e:
             raise CSVParserError(f"CSV parsing error: {str(e)}")
+        except UnicodeDecodeError:
+            raise
         except Exception as e:
             logger.error(f"Unexpected error during CSV parse: {str(e)}", exc_info=True)
             raise CSVParserError(f"Failed to parse CSV: {str(e)}")
     
     def _validate_headers(self, columns: List[str]) -> Dict:
         """Validate that required headers are present"""
-        required_fields = ["symbol", "side", "quantity", "price", "executed_at"]
-        checklist = []
-        missing = []
-        
-        for field in required_fields:
-            possible_headers = self.header_map.get(field, [])
-            found = any(col in columns for col in possible_headers)
-            
-            if found:
-                checklist.append(f"✓ {field} column found")
-            else:
-                checklist.append(f"✗ {field} column not found")
-                missing.append(field)
+        column_set = set(columns)
+        found = [bool(self.header_map[field] & column_set) for field in self.REQUIRED_FIELDS]
         
-        if missing:
-            return {
-                "valid": False,
-                "message": f"Missing required columns: {', '.join(missing)}",
-                "checklist": checklist
-            }
+        if all(found):
+            return {"valid": True}
         
-        return {"valid": True, "checklist": checklist}
+        # Only failures need the per-field checklist
+        checklist = [
+            f"✓ {field} column found" if field_found else f"✗ {field} column not found"
+            for field, field_found in zip(self.REQUIRED_FIELDS, found)
+        ]
+        missing = [
+            field for field, field_found in zip(self.REQUIRED_FIELDS, found)
+            if not field_found
+        ]
+        return {
+            "valid": False,
+            "message": f"Missing required columns: {', '.join(missing)}",
+            "checklist": checklist
+        }
     
     def _normalize_columns(self, df: pd.DataFrame) -> pd.DataFrame:
         """Normalize column names to unified format"""
@@ -186,7 +204,109 @@ class CSVParser:
         logger.debug(f"Normalized columns: {rename_map}")
         return df
     
-    def _parse_row(self, row: pd.Series, row_num: int) -> Dict:
+    def _parse_frame(self, df: pd.DataFrame) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Convert and validate all rows with column operations
+        
+        Applies the same rules as _parse_row to whole columns. Only rejected
+        rows go through _parse_row, to produce their detailed error messages.
+        """
+        symbol = df["symbol"].str.strip().str.upper()
+        side = df["side"].str.strip().str.lower().map(self.SIDE_MAPPINGS)
+        quantity = pd.to_numeric(df["quantity"].str.strip(), errors="coerce")
+        price = pd.to_numeric(
+            df["price"].str.replace(r"[@$]", "", regex=True).str.strip(),
+            errors="coerce"
+        )
+        executed_at = self._parse_timestamps(df["executed_at"])
+        
+        invalid = (
+            symbol.isna() | symbol.eq("") | symbol.eq("NAN")
+            | side.isna()
+            | ~quantity.between(0, 1000000, inclusive="right")
+            | ~price.between(0, 100000, inclusive="right")
+            | executed_at.isna()
+        ).to_numpy()
+        valid = ~invalid
+        
+        trades = [
+            {
+                "symbol": trade_symbol,
+                "side": trade_side,
+                "quantity": trade_quantity,
+                "price": trade_price,
+                "executed_at": trade_executed_at.isoformat(),
+                "account_id": trade_account_id,
+                "notes": trade_notes,
+            }
+            for (
+                trade_symbol, trade_side, trade_quantity, trade_price,
+                trade_executed_at, trade_account_id, trade_notes
+            ) in zip(
+                symbol[valid].tolist(),
+                side[valid].tolist(),
+                quantity[valid].tolist(),
+                price[valid].tolist(),
+                executed_at[valid].tolist(),
+                self._optional_column(df, "account_id")[valid],
+                self._optional_column(df, "notes")[valid],
+            )
+        ]
+        
+        # Rejected rows are revisited as plain dicts, not per-row Series
+        errors = []
+        rejected = df[invalid]
+        for idx, row in zip(rejected.index, rejected.to_dict("records")):
+            row_num = idx + 2  # +2 for header and 0-index
+            try:
+                self._parse_row(row, row_num)
+                message = f"Invalid data in row {row_num}"
+            except Exception as e:
+                message = str(e)
+            logger.warning(f"Error parsing row {row_num}: {message}")
+            errors.append({
+                "row": row_num,
+                "error": message,
+                "data": row
+            })
+        
+        return trades, errors
+    
+    @staticmethod
+    def _optional_column(df: pd.DataFrame, column: str) -> np.ndarray:
+        """Stripped values of an optional column, with None where missing"""
+        if column not in df:
+            return np.full(len(df), None, dtype=object)
+        values = df[column].str.strip()
+        return values.where(values.notna(), None).to_numpy(dtype=object)
+    
+    def _parse_timestamps(self, column: pd.Series) -> pd.Series:
+        """
+        Parse a timestamp column in one pass, with NaT for missing/invalid values
+        
+        Values with a UTC offset are converted to EST; naive values are assumed
+        to be EST, resolving DST gaps and overlaps as standard time.
+        """
+        values = column.str.strip().str.replace(TZ_SUFFIX_PATTERN, "", regex=True)
+        has_offset = values.str.contains(UTC_OFFSET_PATTERN, regex=True, na=False)
+        
+        parsed = pd.Series(pd.NaT, index=column.index, dtype=pd.DatetimeTZDtype(tz=EST))
+        if has_offset.any():
+            parsed[has_offset] = pd.to_datetime(
+                values[has_offset], format="mixed", utc=True, errors="coerce"
+            ).dt.tz_convert(EST)
+        naive = ~has_offset & values.notna()
+        if naive.any():
+            parsed[naive] = pd.to_datetime(
+                values[naive], format="mixed", errors="coerce"
+            ).dt.tz_localize(
+                EST,
+                ambiguous=np.zeros(int(naive.sum()), dtype=bool),
+                nonexistent=pd.Timedelta(hours=1)
+            )
+        return parsed
+    
+    def _parse_row(self, row: Dict, row_num: int) -> Dict:
         """Parse a single row into normalized trade format"""
         try:
             # Extract and validate symbol
@@ -196,14 +316,16 @@ class CSVParser:
             
             # Extract and normalize side
             side_raw = str(row["side"]).strip()
-            side = self.SIDE_MAPPINGS.get(side_raw)
+            side = self.SIDE_MAPPINGS.get(side_raw.lower())
             if not side:
                 raise ValueError(
                     f"Invalid side value '{side_raw}' in row {row_num}. "
-                    f"Must be one of: {', '.join(set(self.SIDE_MAPPINGS.keys()))}"
+                    f"Must be one of: {', '.join(self.SIDE_MAPPINGS)}"
                 )
             
             # Extract and validate quantity
+            if pd.isna(row["quantity"]):
+                raise ValueError(f"Quantity is required in row {row_num}")
             quantity = float(row["quantity"])
             if quantity <= 0:
                 raise ValueError(f"Quantity must be positive in row {row_num}, got {quantity}")
@@ -211,6 +333,8 @@ class CSVParser:
                 raise ValueError(f"Quantity exceeds maximum (1,000,000) in row {row_num}")
             
             # Extract and validate price (strip @ symbol if present)
+            if pd.isna(row["price"]):
+                raise ValueError(f"Price is required in row {row_num}")
             price_str = str(row["price"]).strip().replace("@", "").replace("$", "")
             price = float(price_str)
             if price <= 0:
@@ -253,10 +377,7 @@ class CSVParser:
         timestamp_str = str(timestamp_str).strip()
         
         # Strip timezone suffixes (EST, EDT, PST, etc.) - we'll add EST back later
-        for tz_suffix in [' EST', ' EDT', ' PST', ' PDT', ' CST', ' CDT', ' MST', ' MDT']:
-            if timestamp_str.endswith(tz_suffix):
-                timestamp_str = timestamp_str[:-len(tz_suffix)].strip()
-                break
+        timestamp_str = TZ_SUFFIX_PATTERN.sub("", timestamp_str)
         
         # Try different formats
         formats = [
@@ -285,8 +406,20 @@ class CSVParser:
                     "Expected format: YYYY-MM-DD HH:MM:SS or ISO 8601"
                 )
         
-        # Add timezone if not present (assume EST)
+        # Add timezone if not present (assume EST); fold=1 resolves the
+        # repeated hour at the end of DST to standard time
         if dt.tzinfo is None:
-            dt = EST.localize(dt)
+            dt = dt.replace(tzinfo=EST, fold=1)
         
         return dt
+
+
+def parse_csv_bytes(template: str, data: bytes) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Parse UTF-8 encoded CSV content with the given template
+    
+    Module-level so it can run in a worker process: only the template name,
+    the raw bytes and the parsed rows cross the process boundary.
+    """
+    parser = CSVParser(template=template)
+    return parser.parse_stream(TextIOWrapper(BytesIO(data), encoding="utf-8", newline=""))
@@ -10,18 +10,121 @@ Calculates detailed metrics for AI insights:
 - Risk metrics
 """
 import logging
-from typing import List, Dict, Any, Optional
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, Sequence, Tuple
 from datetime import datetime, timedelta
-from collections import defaultdict
-from sqlalchemy import func
+
+import numpy as np
+from sqlalchemy import Double, SmallInteger, cast, extract, func, select
 from sqlalchemy.orm import Session
 
+from app.models.base import account_filter
 from app.models.trade import ClosedLot
 from app.models.metrics import PerDayPnL
 
 logger = logging.getLogger(__name__)
 
 
+# Leveraged ETFs counted by calculate_symbol_concentration
+_LEVERAGED_ETFS = frozenset({'TQQQ', 'SQQQ', 'UPRO', 'SPXU', 'TNA', 'TZA', 'UDOW', 'SDOW'})
+
+
+@dataclass
+class _Columns:
+    """
+    Closed lots as parallel arrays (struct of arrays), one entry per lot.
+    
+    Times are epoch seconds, NaN when missing; hour and month are the close
+    time's wall-clock fields in the time zone it was read in (the database
+    session's for loaded lots), -1 when it is missing. sign is the P&L sign
+    (1 win, -1 loss, 0 breakeven), shared by every win/loss split.
+    """
+    symbol: np.ndarray
+    pnl: np.ndarray
+    sign: np.ndarray
+    qty: np.ndarray
+    open_ts: np.ndarray
+    close_ts: np.ndarray
+    hour: np.ndarray
+    month: np.ndarray
+    
+    def __len__(self) -> int:
+        return len(self.pnl)
+
+
+def _extract_columns(lots: Sequence[ClosedLot]) -> _Columns:
+    """Read every lot attribute the metrics need in a single pass."""
+    rows = []
+    for lot in lots:
+        opened = lot.open_executed_at
+        closed = lot.close_executed_at
+        rows.append((
+            lot.symbol,
+            lot.realized_pnl,
+            lot.open_quantity,
+            opened.timestamp() if opened else np.nan,
+            closed.timestamp() if closed else np.nan,
+            closed.hour if closed else -1,
+            closed.month if closed else -1
+        ))
+    return _build_columns(rows)
+
+
+def _build_columns(rows: Sequence[Tuple]) -> _Columns:
+    """
+    Transpose (symbol, realized_pnl, open_quantity, open_ts, close_ts,
+    close_hour, close_month) tuples into columns.
+    """
+    count = len(rows)
+    if count:
+        symbols, pnls, quantities, opened, closed, hours, months = zip(*rows)
+    else:
+        symbols = pnls = quantities = opened = closed = hours = months = ()
+    
+    symbol = np.empty(count, dtype=object)
+    symbol[:] = symbols
+    pnl = np.fromiter(map(float, pnls), dtype=np.float64, count=count)
+    
+    return _Columns(
+        symbol=symbol,
+        pnl=pnl,
+        sign=np.sign(pnl).astype(np.int8),
+        qty=np.fromiter(map(float, quantities), dtype=np.float64, count=count),
+        open_ts=np.fromiter(opened, dtype=np.float64, count=count),
+        close_ts=np.fromiter(closed, dtype=np.float64, count=count),
+        hour=np.fromiter(hours, dtype=np.int8, count=count),
+        month=np.fromiter(months, dtype=np.int8, count=count)
+    )
+
+
+def _streaks(signs: np.ndarray) -> Tuple[int, int, int]:
+    """
+    Run-length encode P&L signs in close order and return streak counters.
+    
+    Returns (current streak, longest win streak, longest loss streak); the
+    current streak is the last win or loss run, negative for losses.
+    Breakeven lots end a run without starting a streak of their own.
+    """
+    if not signs.size:
+        return 0, 0, 0
+    
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(signs)) + 1))
+    lengths = np.diff(np.append(starts, signs.size))
+    run_signs = signs[starts]
+    
+    win_runs = lengths[run_signs == 1]
+    loss_runs = lengths[run_signs == -1]
+    scored = np.flatnonzero(run_signs)
+    current = int(lengths[scored[-1]] * run_signs[scored[-1]]) if scored.size else 0
+    
+    return (
+        current,
+        int(win_runs.max()) if win_runs.size else 0,
+        int(loss_runs.max()) if loss_runs.size else 0
+    )
+
+
 class EnhancedMetricsCalculator:
     """Calculate advanced trading metrics for AI insights."""
     
@@ -29,49 +132,74 @@ class EnhancedMetricsCalculator:
         self.db = db
         self.account_id = account_id
     
-    def calculate_all_enhanced_metrics(self, lots: List[ClosedLot]) -> Dict[str, Any]:
-        """Calculate all enhanced metrics from closed lots."""
-        if not lots:
+    def load_columns(self) -> _Columns:
+        """
+        Load only the closed-lot columns the metrics use.
+        
+        Rows come back as plain tuples from a Core select and are transposed
+        straight into arrays; no ORM instances are hydrated and no per-lot
+        attribute access is needed. Timestamps are read as epoch seconds and
+        the close hour/month are extracted by Postgres, so no datetime
+        objects are built either.
+        """
+        closed_at = ClosedLot.close_executed_at
+        stmt = select(
+            ClosedLot.symbol,
+            ClosedLot.realized_pnl,
+            ClosedLot.open_quantity,
+            cast(extract("epoch", ClosedLot.open_executed_at), Double),
+            cast(extract("epoch", closed_at), Double),
+            # Session time zone, the same one returned datetimes would carry
+            cast(extract("hour", closed_at), SmallInteger),
+            cast(extract("month", closed_at), SmallInteger),
+        )
+        
+        stmt = stmt.where(account_filter(ClosedLot, self.account_id))
+        
+        return _build_columns(self.db.execute(stmt).tuples().all())
+    
+    def calculate_all_enhanced_metrics(
+        self,
+        lots: Optional[Sequence[ClosedLot]] = None
+    ) -> Dict[str, Any]:
+        """
+        Calculate all enhanced metrics from closed lots.
+        
+        Lots are extracted into arrays once; every calculate_* method works
+        on those columns instead of re-reading lot attributes.
+        
+        Args:
+            lots: Closed lots to analyze; loaded from the database when omitted
+        """
+        if lots is None:
+            return self._calculate_all(self.load_columns())
+        return self._calculate_all(_extract_columns(lots))
+    
+    def _calculate_all(self, cols: _Columns) -> Dict[str, Any]:
+        """Calculate every enhanced metric from extracted lot columns."""
+        if not len(cols):
             return self._get_empty_metrics()
         
-        logger.info(f"Calculating enhanced metrics for {len(lots)} lots")
+        logger.info(f"Calculating enhanced metrics for {len(cols)} lots")
         
         metrics = {
-            **self.calculate_holding_times(lots),
-            **self.calculate_symbol_concentration(lots),
-            **self.calculate_streaks(lots),
-            **self.calculate_timing_patterns(lots),
-            **self.calculate_position_sizing(lots),
-            **self.calculate_risk_metrics(lots)
+            **self.calculate_holding_times(cols),
+            **self.calculate_symbol_concentration(cols),
+            **self.calculate_streaks(cols),
+            **self.calculate_timing_patterns(cols),
+            **self.calculate_position_sizing(cols),
+            **self.calculate_risk_metrics()
         }
         
         logger.info("Enhanced metrics calculation complete")
         return metrics
     
-    def calculate_holding_times(self, lots: List[ClosedLot]) -> Dict[str, Any]:
+    def calculate_holding_times(self, cols: _Columns) -> Dict[str, Any]:
         """Calculate holding time statistics."""
-        holding_times = []
-        winner_times = []
-        loser_times = []
-        quick_flips = 0
-        
-        for lot in lots:
-            if not lot.open_executed_at or not lot.close_executed_at:
-                continue
-            
-            holding_time = (lot.close_executed_at - lot.open_executed_at).total_seconds() / 60  # minutes
-            holding_times.append(holding_time)
-            
-            if lot.realized_pnl > 0:
-                winner_times.append(holding_time)
-            elif lot.realized_pnl < 0:
-                loser_times.append(holding_time)
-            
-            # Quick flip = held less than 60 minutes
-            if holding_time < 60:
-                quick_flips += 1
+        holding_times = (cols.close_ts - cols.open_ts) / 60  # minutes
+        has_times = ~np.isnan(holding_times)
         
-        if not holding_times:
+        if not has_times.any():
             return {
                 "avg_holding_time_minutes": 0,
                 "avg_holding_time_winners": 0,
@@ -79,38 +207,36 @@ class EnhancedMetricsCalculator:
                 "quick_flip_rate": 0
             }
         
-        avg_holding = sum(holding_times) / len(holding_times)
-        avg_winner_time = sum(winner_times) / len(winner_times) if winner_times else 0
-        avg_loser_time = sum(loser_times) / len(loser_times) if loser_times else 0
+        holding_times = holding_times[has_times]
+        sign = cols.sign[has_times]
+        winner_times = holding_times[sign == 1]
+        loser_times = holding_times[sign == -1]
+        
+        avg_winner_time = winner_times.mean() if winner_times.size else 0
+        avg_loser_time = loser_times.mean() if loser_times.size else 0
+        
+        # Quick flip = held less than 60 minutes
+        quick_flips = np.count_nonzero(holding_times < 60)
         
         return {
-            "avg_holding_time_minutes": round(avg_holding, 1),
-            "avg_holding_time_winners": round(avg_winner_time, 1),
-            "avg_holding_time_losers": round(avg_loser_time, 1),
-            "quick_flip_rate": round(quick_flips / len(lots), 3)
+            "avg_holding_time_minutes": round(float(holding_times.mean()), 1),
+            "avg_holding_time_winners": round(float(avg_winner_time), 1),
+            "avg_holding_time_losers": round(float(avg_loser_time), 1),
+            "quick_flip_rate": round(quick_flips / len(cols), 3)
         }
     
-    def calculate_symbol_concentration(self, lots: List[ClosedLot]) -> Dict[str, Any]:
+    def calculate_symbol_concentration(self, cols: _Columns) -> Dict[str, Any]:
         """Calculate symbol concentration and diversity metrics."""
-        symbol_counts = defaultdict(int)
-        symbol_pnl = defaultdict(float)
-        leveraged_etfs = {'TQQQ', 'SQQQ', 'UPRO', 'SPXU', 'TNA', 'TZA', 'UDOW', 'SDOW'}
-        leveraged_count = 0
-        
-        for lot in lots:
-            symbol_counts[lot.symbol] += 1
-            symbol_pnl[lot.symbol] += float(lot.realized_pnl)
-            
-            if lot.symbol in leveraged_etfs:
-                leveraged_count += 1
-        
-        # Sort by trade count
-        sorted_symbols = sorted(symbol_counts.items(), key=lambda x: x[1], reverse=True)
-        top_3_symbols = [s[0] for s in sorted_symbols[:3]]
-        top_3_counts = [s[1] for s in sorted_symbols[:3]]
+        # Hash-count symbol strings; np.unique would sort them with Python
+        # comparisons. most_common keeps first-seen order for count ties.
+        symbol_counts = Counter(cols.symbol.tolist())
+        top_3 = symbol_counts.most_common(3)
+        top_3_symbols = [symbol for symbol, _ in top_3]
+        top_3_counts = [count for _, count in top_3]
+        leveraged_count = sum(symbol_counts[symbol] for symbol in _LEVERAGED_ETFS)
         
         # Calculate concentration ratio (top 3 / total)
-        total_trades = len(lots)
+        total_trades = len(cols)
         top_3_total = sum(top_3_counts)
         concentration_ratio = top_3_total / total_trades if total_trades > 0 else 0
         
@@ -122,32 +248,11 @@ class EnhancedMetricsCalculator:
             "leveraged_etf_pct": round(leveraged_count / total_trades, 3) if total_trades > 0 else 0
         }
     
-    def calculate_streaks(self, lots: List[ClosedLot]) -> Dict[str, Any]:
+    def calculate_streaks(self, cols: _Columns) -> Dict[str, Any]:
         """Calculate win/loss streak statistics."""
         # Sort by close time
-        sorted_lots = sorted(lots, key=lambda x: x.close_executed_at)
-        
-        current_streak = 0
-        longest_win_streak = 0
-        longest_loss_streak = 0
-        current_win_streak = 0
-        current_loss_streak = 0
-        
-        for lot in sorted_lots:
-            if lot.realized_pnl > 0:
-                current_win_streak += 1
-                current_loss_streak = 0
-                current_streak = current_win_streak
-                longest_win_streak = max(longest_win_streak, current_win_streak)
-            elif lot.realized_pnl < 0:
-                current_loss_streak += 1
-                current_win_streak = 0
-                current_streak = -current_loss_streak
-                longest_loss_streak = max(longest_loss_streak, current_loss_streak)
-            else:
-                # Breakeven - reset streaks
-                current_win_streak = 0
-                current_loss_streak = 0
+        order = np.argsort(cols.close_ts, kind="stable")
+        current_streak, longest_win_streak, longest_loss_streak = _streaks(cols.sign[order])
         
         return {
             "current_streak": current_streak,
@@ -155,44 +260,22 @@ class EnhancedMetricsCalculator:
             "longest_loss_streak": longest_loss_streak
         }
     
-    def calculate_timing_patterns(self, lots: List[ClosedLot]) -> Dict[str, Any]:
+    def calculate_timing_patterns(self, cols: _Columns) -> Dict[str, Any]:
         """Calculate best/worst trading times."""
-        hour_pnl = defaultdict(list)
-        month_pnl = defaultdict(list)
-        
-        for lot in lots:
-            if not lot.close_executed_at:
-                continue
-            
-            # Hour of day (EST)
-            hour = lot.close_executed_at.hour
-            hour_pnl[hour].append(float(lot.realized_pnl))
-            
-            # Month
-            month = lot.close_executed_at.month
-            month_pnl[month].append(float(lot.realized_pnl))
+        has_close = cols.hour >= 0
+        pnl = cols.pnl[has_close]
         
-        # Calculate average P&L per hour
-        hour_avgs = {h: sum(pnls) / len(pnls) for h, pnls in hour_pnl.items() if pnls}
-        best_hour = max(hour_avgs.items(), key=lambda x: x[1]) if hour_avgs else (0, 0)
-        worst_hour = min(hour_avgs.items(), key=lambda x: x[1]) if hour_avgs else (0, 0)
-        
-        # Calculate average P&L per month
-        month_avgs = {m: sum(pnls) / len(pnls) for m, pnls in month_pnl.items() if pnls}
-        best_month = max(month_avgs.items(), key=lambda x: x[1]) if month_avgs else (0, 0)
-        worst_month = min(month_avgs.items(), key=lambda x: x[1]) if month_avgs else (0, 0)
+        # Average P&L per hour of day (EST) and per month
+        best_hour, worst_hour = self._best_and_worst_average(cols.hour[has_close], pnl, 24)
+        best_month, worst_month = self._best_and_worst_average(cols.month[has_close], pnl, 13)
         
         month_names = ['', 'January', 'February', 'March', 'April', 'May', 'June',
                        'July', 'August', 'September', 'October', 'November', 'December']
         
-        # Calculate trades per day
-        if lots:
-            first_trade = min(lot.close_executed_at for lot in lots if lot.close_executed_at)
-            last_trade = max(lot.close_executed_at for lot in lots if lot.close_executed_at)
-            days_trading = (last_trade - first_trade).days + 1
-            trades_per_day = len(lots) / days_trading if days_trading > 0 else 0
-        else:
-            trades_per_day = 0
+        # Calculate trades per day (range of close times in one reduction)
+        close_ts = cols.close_ts[has_close]
+        days_trading = int(np.ptp(close_ts) // 86400) + 1 if close_ts.size else 0
+        trades_per_day = len(cols) / days_trading if days_trading > 0 else 0
         
         return {
             "best_hour": f"{best_hour[0]:02d}:00-{best_hour[0]+1:02d}:00",
@@ -206,11 +289,37 @@ class EnhancedMetricsCalculator:
             "trades_per_day_avg": round(trades_per_day, 1)
         }
     
-    def calculate_position_sizing(self, lots: List[ClosedLot]) -> Dict[str, Any]:
+    @staticmethod
+    def _best_and_worst_average(
+        keys: np.ndarray,
+        pnl: np.ndarray,
+        size: int
+    ) -> Tuple[Tuple[int, float], Tuple[int, float]]:
+        """
+        Group P&L by small integer keys and pick the best and worst average.
+        
+        Returns (key, average) pairs, or (0, 0) for both when there is no data.
+        Ties go to the lowest key.
+        """
+        counts = np.bincount(keys, minlength=size)
+        traded = np.flatnonzero(counts)
+        if not traded.size:
+            return (0, 0), (0, 0)
+        
+        sums = np.bincount(keys, weights=pnl, minlength=size)
+        averages = sums[traded] / counts[traded]
+        best = averages.argmax()
+        worst = averages.argmin()
+        return (
+            (int(traded[best]), float(averages[best])),
+            (int(traded[worst]), float(averages[worst]))
+        )
+    
+    def calculate_position_sizing(self, cols: _Columns) -> Dict[str, Any]:
         """Calculate position sizing statistics."""
-        quantities = [abs(float(lot.open_quantity)) for lot in lots]
+        quantities = np.abs(cols.qty)
         
-        if not quantities:
+        if not quantities.size:
             return {
                 "avg_position_size_shares": 0,
                 "position_size_std_dev": 0,
@@ -219,11 +328,10 @@ class EnhancedMetricsCalculator:
                 "sizing_consistency_score": 0
             }
         
-        avg_size = sum(quantities) / len(quantities)
+        avg_size = float(quantities.mean())
         
-        # Calculate standard deviation
-        variance = sum((q - avg_size) ** 2 for q in quantities) / len(quantities)
-        std_dev = variance ** 0.5
+        # Population standard deviation
+        std_dev = float(quantities.std())
         
         # Consistency score: 1 - (std_dev / avg_size), clamped to 0-1
         consistency = max(0, min(1, 1 - (std_dev / avg_size))) if avg_size > 0 else 0
@@ -231,54 +339,49 @@ class EnhancedMetricsCalculator:
         return {
             "avg_position_size_shares": round(avg_size, 1),
             "position_size_std_dev": round(std_dev, 1),
-            "largest_position": round(max(quantities), 1),
-            "smallest_position": round(min(quantities), 1),
+            "largest_position": round(float(quantities.max()), 1),
+            "smallest_position": round(float(quantities.min()), 1),
             "sizing_consistency_score": round(consistency, 3)
         }
     
-    def calculate_risk_metrics(self, lots: List[ClosedLot]) -> Dict[str, Any]:
-        """Calculate risk and drawdown metrics."""
-        # Get daily P&L series for drawdown calculation
-        query = self.db.query(PerDayPnL).order_by(PerDayPnL.date)
-        
-        if self.account_id:
-            query = query.filter(PerDayPnL.account_id == self.account_id)
-        else:
-            query = query.filter(PerDayPnL.account_id.is_(None))
-        
-        daily_records = query.all()
-        
-        if not daily_records:
+    def calculate_risk_metrics(self) -> Dict[str, Any]:
+        """
+        Calculate risk and drawdown metrics.
+        
+        Both figures are aggregated in SQL over the daily P&L series, so only
+        one row comes back regardless of how many days the account spans.
+        """
+        series = (
+            select(
+                PerDayPnL.cumulative_pnl,
+                PerDayPnL.daily_pnl,
+                func.max(PerDayPnL.cumulative_pnl).over(order_by=PerDayPnL.date).label("peak")
+            )
+            .where(account_filter(PerDayPnL, self.account_id))
+            .subquery("series")
+        )
+        days, max_drawdown, volatility = self.db.execute(
+            select(
+                func.count(),
+                # Largest drop below the running peak
+                func.max(series.c.peak - series.c.cumulative_pnl),
+                # Population std dev of daily P&L
+                func.stddev_pop(series.c.daily_pnl)
+            )
+        ).one()
+        
+        if not days:
             return {
                 "max_drawdown": 0,
                 "max_drawdown_pct": 0,
                 "daily_pnl_volatility": 0
             }
         
-        # Calculate max drawdown
-        cumulative_pnls = [float(r.cumulative_pnl) for r in daily_records]
-        daily_pnls = [float(r.daily_pnl) for r in daily_records]
-        
-        max_drawdown = 0
-        peak = cumulative_pnls[0]
-        
-        for pnl in cumulative_pnls:
-            if pnl > peak:
-                peak = pnl
-            drawdown = peak - pnl
-            if drawdown > max_drawdown:
-                max_drawdown = drawdown
-        
-        # Calculate volatility (std dev of daily P&L)
-        avg_daily_pnl = sum(daily_pnls) / len(daily_pnls) if daily_pnls else 0
-        variance = sum((p - avg_daily_pnl) ** 2 for p in daily_pnls) / len(daily_pnls) if daily_pnls else 0
-        volatility = variance ** 0.5
-        
         # Note: Drawdown % removed - misleading without account balance
         # Per PRD: No account balance in MVP, so only show dollar amount
         return {
-            "max_drawdown": round(max_drawdown, 2),
-            "daily_pnl_volatility": round(volatility, 2)
+            "max_drawdown": round(float(max_drawdown), 2),
+            "daily_pnl_volatility": round(float(volatility), 2)
         }
     
     def _get_empty_metrics(self) -> Dict[str, Any]:
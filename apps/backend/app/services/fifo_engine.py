@@ -5,18 +5,73 @@ Supports both:
 - Long positions: BUY → SELL
 - Short positions: SELL → BUY (sell first, buy later to close)
 
-Uses dual-queue FIFO logic per symbol.
+Uses dual-queue FIFO logic per symbol, matched with vectorized NumPy kernels.
 """
 import logging
-from decimal import Decimal, ROUND_HALF_UP
-from typing import List, Dict, Tuple, Optional
+import operator
+from decimal import Decimal
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
 from datetime import datetime
-from collections import defaultdict, deque
 
-from app.models.trade import NormalizedTrade, ClosedLot
+import numpy as np
+import pandas as pd
+
+from app.models.trade import NormalizedTrade
 
 logger = logging.getLogger(__name__)
 
+# Columns expected by FIFOEngine.process_dataframe
+TRADE_COLUMNS = ["id", "account_id", "symbol", "side", "quantity", "price", "executed_at"]
+
+# Quantities are matched as integer multiples of 1e-8 shares (NUMERIC(18,8))
+QUANTITY_SCALE = 8
+QUANTITY_UNITS = 10 ** QUANTITY_SCALE
+
+# Prices are matched as integer micro-dollars
+PRICE_SCALE = 6
+PRICE_UNITS = 10 ** PRICE_SCALE
+
+# Price units times quantity units per cent of realized P&L
+_PNL_UNITS_PER_CENT = PRICE_UNITS * QUANTITY_UNITS // 100
+
+
+class ClosedLotRecord(NamedTuple):
+    """
+    Closed lot produced by FIFO matching.
+    
+    Fields mirror the writable ClosedLot columns, so records are bulk-inserted
+    as-is; no ORM instance or instrumentation is created per lot.
+    """
+    account_id: Optional[str]
+    symbol: str
+    position_type: str
+    open_trade_id: int
+    open_quantity: Decimal
+    open_price: Decimal
+    open_executed_at: datetime
+    close_trade_id: int
+    close_quantity: Decimal
+    close_price: Decimal
+    close_executed_at: datetime
+    realized_pnl: Decimal
+
+
+def _to_cents(value: int, units_per_cent: int) -> Decimal:
+    """Round an integer amount to cents, half away from zero (ROUND_HALF_UP)."""
+    cents = (abs(value) + units_per_cent // 2) // units_per_cent
+    return Decimal(cents if value >= 0 else -cents).scaleb(-2)
+
+
+def _to_decimal(value) -> Decimal:
+    """Decimal for a price value; Decimals and ints skip the str() round trip."""
+    value_type = type(value)
+    if value_type is Decimal:
+        return value
+    if value_type is int:
+        return Decimal(value)
+    # Floats go through their shortest repr, e.g. 150.1 -> Decimal('150.1')
+    return Decimal(str(value))
+
 
 class FIFOEngine:
     """
@@ -28,14 +83,16 @@ class FIFOEngine:
     """
     
     def __init__(self):
-        # Per-symbol queues: {symbol: deque of (trade, remaining_qty)}
-        self.long_queues: Dict[str, deque] = defaultdict(deque)
-        self.short_queues: Dict[str, deque] = defaultdict(deque)
+        # Open lots left after matching, oldest first:
+        # {symbol: (price_units, quantity_units)} as parallel int64 arrays
+        self.long_queues: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self.short_queues: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
         
         # Closed lots generated
-        self.closed_lots: List[ClosedLot] = []
+        self.closed_lots: List[ClosedLotRecord] = []
+        self.trades_processed = 0
     
-    def process_trades(self, trades: List[NormalizedTrade]) -> List[ClosedLot]:
+    def process_trades(self, trades: List[NormalizedTrade]) -> List[ClosedLotRecord]:
         """
         Process a list of trades and generate closed lots.
         
@@ -43,18 +100,40 @@ class FIFOEngine:
             trades: List of NormalizedTrade objects, sorted by executed_at ASC
         
         Returns:
-            List of ClosedLot objects with realized P&L
+            List of ClosedLotRecord tuples with realized P&L
         """
-        logger.info(f"Processing {len(trades)} trades for FIFO matching")
+        frame = pd.DataFrame(
+            [
+                (trade.id, trade.account_id, trade.symbol, trade.side,
+                 trade.quantity, trade.price, trade.executed_at)
+                for trade in trades
+            ],
+            columns=TRADE_COLUMNS
+        )
+        return self.process_dataframe(frame)
+    
+    def process_dataframe(self, frame: pd.DataFrame) -> List[ClosedLotRecord]:
+        """
+        Match trades given as columns and generate closed lots.
         
-        # Reset state
-        self.long_queues.clear()
-        self.short_queues.clear()
-        self.closed_lots.clear()
+        Because a BUY always closes shorts before opening longs (and a SELL the
+        reverse), only one side of a symbol's book is ever open, and dual-queue
+        FIFO pairs the k-th share bought with the k-th share sold. Matching is
+        therefore an intersection of the cumulative BUY and SELL quantity
+        ranges per symbol, computed with cumsum/searchsorted for all symbols
+        at once instead of a per-trade queue walk.
         
-        # Process each trade in chronological order
-        for trade in trades:
-            self._process_trade(trade)
+        Args:
+            frame: DataFrame with TRADE_COLUMNS, sorted by executed_at ASC
+                within each symbol
+        
+        Returns:
+            List of ClosedLotRecord tuples with realized P&L, ordered by closing trade
+        """
+        logger.info(f"Processing {len(frame)} trades for FIFO matching")
+        
+        self._reset()
+        self._match(frame)
         
         logger.info(
             f"FIFO matching complete - generated {len(self.closed_lots)} closed lots"
@@ -62,140 +141,214 @@ class FIFOEngine:
         
         return self.closed_lots
     
-    def _process_trade(self, trade: NormalizedTrade):
-        """Process a single trade through FIFO matching"""
-        symbol = trade.symbol
-        quantity = Decimal(str(trade.quantity))
-        
-        if trade.side == "BUY":
-            # BUY can close SHORT positions or open LONG positions
-            remaining = self._match_against_queue(
-                trade=trade,
-                quantity=quantity,
-                queue=self.short_queues[symbol],
-                position_type="SHORT"
-            )
-            
-            # Any remaining quantity opens a new LONG position
-            if remaining > 0:
-                self.long_queues[symbol].append((trade, remaining))
-                logger.debug(
-                    f"Opened LONG position: {symbol} {remaining}@{trade.price}"
-                )
-        
-        elif trade.side == "SELL":
-            # SELL can close LONG positions or open SHORT positions
-            remaining = self._match_against_queue(
-                trade=trade,
-                quantity=quantity,
-                queue=self.long_queues[symbol],
-                position_type="LONG"
-            )
-            
-            # Any remaining quantity opens a new SHORT position
-            if remaining > 0:
-                self.short_queues[symbol].append((trade, remaining))
-                logger.debug(
-                    f"Opened SHORT position: {symbol} {remaining}@{trade.price}"
-                )
-    
-    def _match_against_queue(
-        self,
-        trade: NormalizedTrade,
-        quantity: Decimal,
-        queue: deque,
-        position_type: str
-    ) -> Decimal:
+    def process_chunks(self, chunks: Iterable[pd.DataFrame]) -> List[ClosedLotRecord]:
         """
-        Match a trade against an existing position queue (FIFO).
+        Match trades streamed in chunks and generate closed lots.
+        
+        Chunks must be ordered by (symbol, executed_at). Each symbol is matched
+        as soon as its last row has arrived, so only one chunk plus the rows of
+        the symbol in progress are held in memory.
         
         Args:
-            trade: The closing trade
-            quantity: Quantity to match
-            queue: Queue of open positions to match against
-            position_type: "LONG" or "SHORT"
+            chunks: DataFrames with TRADE_COLUMNS, e.g. from pd.read_sql(chunksize=...)
         
         Returns:
-            Remaining unmatched quantity
+            List of ClosedLotRecord tuples with realized P&L
         """
-        remaining = quantity
+        self._reset()
+        pending = None
         
-        while remaining > 0 and queue:
-            open_trade, open_qty = queue[0]
-            
-            # Match quantity (take minimum of remaining and open)
-            match_qty = min(remaining, open_qty)
+        for chunk in chunks:
+            if chunk.empty:
+                continue
+            if pending is not None:
+                chunk = pd.concat([pending, chunk], ignore_index=True)
             
-            # Create closed lot
-            closed_lot = self._create_closed_lot(
-                open_trade=open_trade,
-                close_trade=trade,
-                quantity=match_qty,
-                position_type=position_type
-            )
-            self.closed_lots.append(closed_lot)
+            # The last symbol may continue in the next chunk
+            in_progress = (chunk["symbol"] == chunk["symbol"].iat[-1]).to_numpy()
+            self._match(chunk[~in_progress].reset_index(drop=True))
+            pending = chunk[in_progress].reset_index(drop=True)
+        
+        if pending is not None:
+            self._match(pending)
+        
+        logger.info(
+            f"FIFO matching complete - {self.trades_processed} trades, "
+            f"generated {len(self.closed_lots)} closed lots"
+        )
+        
+        return self.closed_lots
+    
+    def _reset(self):
+        """Clear queues and results before a new run."""
+        self.long_queues.clear()
+        self.short_queues.clear()
+        self.closed_lots.clear()
+        self.trades_processed = 0
+    
+    def _match(self, frame: pd.DataFrame):
+        """Match every symbol in frame, appending to closed_lots and the open queues."""
+        self.trades_processed += len(frame)
+        if frame.empty:
+            return
+        
+        # Exact integer share units; NUMERIC(18,8) quantities
+        units = np.rint(
+            frame["quantity"].to_numpy(dtype=np.float64) * QUANTITY_UNITS
+        ).astype(np.int64)
+        is_buy = (frame["side"] == "BUY").to_numpy()
+        prices = list(map(_to_decimal, frame["price"].tolist()))
+        # P&L is computed on exact integers; Decimal only in the lot records
+        price_units = np.rint(
+            frame["price"].to_numpy(dtype=np.float64) * PRICE_UNITS
+        ).astype(np.int64)
+        
+        # Symbols are interned to int codes; each code maps to one shared str,
+        # so lots and queues of a symbol all reference the same object
+        symbol_codes, symbol_names = pd.factorize(frame["symbol"])
+        symbol_names = np.asarray(symbol_names, dtype=object)
+        symbol_count = len(symbol_names)
+        buys, buy_codes, buy_ends, bought = self._side_ranges(
+            np.flatnonzero(is_buy), symbol_codes, units, symbol_count
+        )
+        sells, sell_codes, sell_ends, sold = self._side_ranges(
+            np.flatnonzero(~is_buy), symbol_codes, units, symbol_count
+        )
+        matched = np.minimum(bought, sold)
+        
+        # Lay symbols out on one quantity axis in disjoint [base, base + span)
+        # ranges so every symbol is matched in the same vectorized pass
+        span = np.maximum(bought, sold)
+        base = np.concatenate(([0], np.cumsum(span)[:-1]))
+        buy_axis = base[buy_codes] + buy_ends
+        sell_axis = base[sell_codes] + sell_ends
+        
+        # Every symbol start and BUY or SELL boundary inside a matched range
+        # starts a new lot; pieces in the unmatched gaps are dropped
+        points = np.unique(np.concatenate((
+            base[matched > 0],
+            buy_axis[buy_ends <= matched[buy_codes]],
+            sell_axis[sell_ends <= matched[sell_codes]]
+        )))
+        starts = points[:-1]
+        piece_codes = np.searchsorted(base, starts, side="right") - 1
+        in_matched = starts < base[piece_codes] + matched[piece_codes]
+        starts = starts[in_matched]
+        lot_units = points[1:][in_matched] - starts
+        buy_rows = buys[np.searchsorted(buy_axis, starts, side="right")]
+        sell_rows = sells[np.searchsorted(sell_axis, starts, side="right")]
+        
+        # Unmatched quantity stays open on the longer side
+        self._queue_remaining(
+            self.long_queues, symbol_names, buys, buy_codes, buy_ends, units, matched, price_units
+        )
+        self._queue_remaining(
+            self.short_queues, symbol_names, sells, sell_codes, sell_ends, units, matched, price_units
+        )
+        
+        # Lots close on the later trade; emit them in closing-trade order
+        is_long = buy_rows < sell_rows
+        open_rows = np.where(is_long, buy_rows, sell_rows)
+        close_rows = np.where(is_long, sell_rows, buy_rows)
+        order = np.argsort(close_rows, kind="stable")
+        
+        ids = frame["id"].tolist()
+        account_ids = frame["account_id"].tolist()
+        symbols = symbol_names[symbol_codes].tolist()
+        executed_at = frame["executed_at"].tolist()
+        lot_prices = price_units.tolist()
+        
+        # Per-lot work is plain list indexing and int math; the DEBUG check
+        # is hoisted so the common path makes no logging call per lot
+        log_matches = logger.isEnabledFor(logging.DEBUG)
+        closed_lots = self.closed_lots
+        for open_row, close_row, quantity_units, long_lot in zip(
+            open_rows[order].tolist(),
+            close_rows[order].tolist(),
+            lot_units[order].tolist(),
+            is_long[order].tolist()
+        ):
+            # LONG: (close - open) * qty; SHORT: (open - close) * qty
+            if long_lot:
+                position_type = "LONG"
+                pnl_units = (lot_prices[close_row] - lot_prices[open_row]) * quantity_units
+            else:
+                position_type = "SHORT"
+                pnl_units = (lot_prices[open_row] - lot_prices[close_row]) * quantity_units
             
-            # Update quantities
-            remaining -= match_qty
-            open_qty -= match_qty
+            quantity = Decimal(quantity_units).scaleb(-QUANTITY_SCALE)
+            realized_pnl = _to_cents(pnl_units, _PNL_UNITS_PER_CENT)
             
-            # Remove from queue if fully matched
-            if open_qty == 0:
-                queue.popleft()
-            else:
-                # Update remaining quantity in queue
-                queue[0] = (open_trade, open_qty)
+            if log_matches:
+                logger.debug(
+                    "Matched %s: %s %s@%s→%s P&L=$%s", position_type, symbols[open_row],
+                    quantity, prices[open_row], prices[close_row], realized_pnl
+                )
             
-            logger.debug(
-                f"Matched {position_type}: {trade.symbol} "
-                f"{match_qty}@{open_trade.price}→{trade.price} "
-                f"P&L=${closed_lot.realized_pnl}"
-            )
-        
-        return remaining
+            closed_lots.append(ClosedLotRecord(
+                account_ids[open_row],
+                symbols[open_row],
+                position_type,
+                ids[open_row],
+                quantity,
+                prices[open_row],
+                executed_at[open_row],
+                ids[close_row],
+                quantity,
+                prices[close_row],
+                executed_at[close_row],
+                realized_pnl
+            ))
     
-    def _create_closed_lot(
-        self,
-        open_trade: NormalizedTrade,
-        close_trade: NormalizedTrade,
-        quantity: Decimal,
-        position_type: str
-    ) -> ClosedLot:
+    @staticmethod
+    def _side_ranges(
+        rows: np.ndarray,
+        symbol_codes: np.ndarray,
+        units: np.ndarray,
+        symbol_count: int
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
         """
-        Create a closed lot with calculated realized P&L.
+        Group one side's rows by symbol and accumulate their quantities.
         
-        P&L calculation:
-        - LONG: (close_price - open_price) * quantity
-        - SHORT: (open_price - close_price) * quantity
+        Returns:
+            Tuple of (rows grouped by symbol in execution order, their symbol
+            codes, cumulative quantity within the symbol at each row's end,
+            total quantity per symbol)
         """
-        open_price = Decimal(str(open_trade.price))
-        close_price = Decimal(str(close_trade.price))
-        
-        # Calculate P&L based on position type
-        if position_type == "LONG":
-            # Long: profit when sell price > buy price
-            pnl = (close_price - open_price) * quantity
-        else:  # SHORT
-            # Short: profit when buy price < sell price
-            pnl = (open_price - close_price) * quantity
-        
-        # Round to 2 decimal places (cents)
-        pnl = pnl.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+        rows = rows[np.argsort(symbol_codes[rows], kind="stable")]
+        codes = symbol_codes[rows]
+        running = np.concatenate(([0], np.cumsum(units[rows])))
+        counts = np.bincount(codes, minlength=symbol_count)
+        offsets = np.concatenate(([0], np.cumsum(counts)))
+        symbol_start = running[offsets[:-1]]
+        totals = running[offsets[1:]] - symbol_start
+        return rows, codes, running[1:] - symbol_start[codes], totals
+    
+    @staticmethod
+    def _queue_remaining(
+        queues: Dict[str, Tuple[np.ndarray, np.ndarray]],
+        symbol_names: np.ndarray,
+        rows: np.ndarray,
+        codes: np.ndarray,
+        ends: np.ndarray,
+        units: np.ndarray,
+        matched: np.ndarray,
+        price_units: np.ndarray
+    ):
+        """Queue the unmatched part of one side as (price_units, quantity_units) arrays per symbol."""
+        remaining = ends - np.maximum(ends - units[rows], matched[codes])
+        is_open = remaining > 0
+        if not is_open.any():
+            return
         
-        return ClosedLot(
-            account_id=open_trade.account_id,
-            symbol=open_trade.symbol,
-            position_type=position_type,
-            open_trade_id=open_trade.id,
-            open_quantity=quantity,
-            open_price=open_price,
-            open_executed_at=open_trade.executed_at,
-            close_trade_id=close_trade.id,
-            close_quantity=quantity,
-            close_price=close_price,
-            close_executed_at=close_trade.executed_at,
-            realized_pnl=pnl
-        )
+        open_codes = codes[is_open]
+        firsts = np.flatnonzero(np.diff(open_codes, prepend=-1))
+        for code, open_prices, open_quantities in zip(
+            open_codes[firsts].tolist(),
+            np.split(price_units[rows[is_open]], firsts[1:]),
+            np.split(remaining[is_open], firsts[1:])
+        ):
+            queues[symbol_names[code]] = (open_prices, open_quantities)
     
     def get_open_positions(self) -> Dict[str, Dict]:
         """
@@ -207,50 +360,52 @@ class FIFOEngine:
         positions = {}
         
         # Long positions
-        for symbol, queue in self.long_queues.items():
-            if queue:
-                total_qty = sum(qty for _, qty in queue)
-                avg_price = sum(
-                    Decimal(str(trade.price)) * qty
-                    for trade, qty in queue
-                ) / total_qty if total_qty > 0 else Decimal('0')
+        for symbol, (price_units, quantity_units) in self.long_queues.items():
+            if len(quantity_units):
+                total_qty, avg_price = self._position_totals(price_units, quantity_units)
                 
                 positions[symbol] = {
                     "type": "LONG",
                     "quantity": total_qty,
-                    "average_price": avg_price.quantize(
-                        Decimal('0.01'), rounding=ROUND_HALF_UP
-                    ),
-                    "lots": len(queue)
+                    "average_price": avg_price,
+                    "lots": len(quantity_units)
                 }
         
         # Short positions
-        for symbol, queue in self.short_queues.items():
-            if queue:
-                total_qty = sum(qty for _, qty in queue)
-                avg_price = sum(
-                    Decimal(str(trade.price)) * qty
-                    for trade, qty in queue
-                ) / total_qty if total_qty > 0 else Decimal('0')
+        for symbol, (price_units, quantity_units) in self.short_queues.items():
+            if len(quantity_units):
+                total_qty, avg_price = self._position_totals(price_units, quantity_units)
                 
                 if symbol in positions:
                     # Both long and short positions exist (unusual but possible)
                     positions[f"{symbol}_SHORT"] = {
                         "type": "SHORT",
                         "quantity": total_qty,
-                        "average_price": avg_price.quantize(
-                            Decimal('0.01'), rounding=ROUND_HALF_UP
-                        ),
-                        "lots": len(queue)
+                        "average_price": avg_price,
+                        "lots": len(quantity_units)
                     }
                 else:
                     positions[symbol] = {
                         "type": "SHORT",
                         "quantity": total_qty,
-                        "average_price": avg_price.quantize(
-                            Decimal('0.01'), rounding=ROUND_HALF_UP
-                        ),
-                        "lots": len(queue)
+                        "average_price": avg_price,
+                        "lots": len(quantity_units)
                     }
         
         return positions
+    
+    @staticmethod
+    def _position_totals(
+        price_units: np.ndarray,
+        quantity_units: np.ndarray
+    ) -> Tuple[Decimal, Decimal]:
+        """Return (total quantity, quantity-weighted average price in cents) of open lots."""
+        total_units = int(quantity_units.sum())
+        if total_units <= 0:
+            return Decimal(total_units).scaleb(-QUANTITY_SCALE), Decimal('0.00')
+        
+        # Exact integer dot product; micro-dollars times 1e-8 shares can
+        # exceed int64, so the products are Python ints rather than np.dot
+        weighted = sum(map(operator.mul, price_units.tolist(), quantity_units.tolist()))
+        avg_price = _to_cents(weighted, total_units * PRICE_UNITS // 100)
+        return Decimal(total_units).scaleb(-QUANTITY_SCALE), avg_price
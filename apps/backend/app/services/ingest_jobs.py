@@ -0,0 +1,82 @@
+"""
+Background processing for CSV ingest jobs.
+
+The upload request stores trades and returns; FIFO matching and the metrics
+refresh run here afterwards, with progress recorded on the IngestJob row.
+"""
+import logging
+import uuid
+from typing import Optional
+
+import pandas as pd
+from sqlalchemy import select
+
+from app.database import get_db_context
+from app.models.ingest import IngestJob
+from app.models.trade import NormalizedTrade
+from app.services.fifo_engine import FIFOEngine, TRADE_COLUMNS
+from app.services.metrics_refresh import replace_closed_lots, refresh_metrics
+
+logger = logging.getLogger(__name__)
+
+
+def run_fifo_and_metrics(job_id: str, account_id: Optional[str]) -> None:
+    """
+    Match an ingest job's trades and refresh the account's metrics.
+
+    Runs outside the request with its own session. Failures are logged and
+    recorded on the job rather than raised.
+
+    Args:
+        job_id: Ingest job whose trades were just stored
+        account_id: Account the trades belong to (None for the default account)
+    """
+    job_uuid = uuid.UUID(job_id)
+
+    try:
+        with get_db_context() as db:
+            # Read back the matching columns in execution order for FIFO matching.
+            # coerce_float=False keeps NUMERIC prices as Decimal, which the
+            # engine passes straight into the lot records.
+            normalized_trades = pd.read_sql(
+                select(*(getattr(NormalizedTrade, column) for column in TRADE_COLUMNS))
+                .where(NormalizedTrade.ingest_job_id == job_uuid)
+                .order_by(NormalizedTrade.executed_at),
+                db.connection(),
+                coerce_float=False
+            )
+
+            logger.info(f"Running FIFO matching engine - job_id={job_id}")
+            fifo_engine = FIFOEngine()
+            closed_lots = fifo_engine.process_dataframe(normalized_trades)
+
+            # Replace closed lots and refresh daily P&L and aggregates in place
+            replace_closed_lots(db, account_id, closed_lots)
+            logger.info(f"Saved {len(closed_lots)} closed lots")
+
+            daily_pnl_series, aggregate = refresh_metrics(db, account_id, closed_lots)
+
+            job = db.get(IngestJob, job_uuid)
+            job.status = "completed"
+            job.lots_closed = len(closed_lots)
+            job.message = (
+                f"Successfully processed {job.trades_processed} trades, "
+                f"generated {len(closed_lots)} closed lots"
+                + (f" ({job.trades_failed} failed)" if job.trades_failed else "")
+            )
+
+            logger.info(
+                f"Ingest job complete - job_id={job_id}, "
+                f"Total P&L: ${aggregate.total_realized_pnl}, Win Rate: {aggregate.win_rate}"
+            )
+
+    except Exception as e:
+        logger.error(
+            f"Background processing failed - job_id={job_id}: {str(e)}",
+            exc_info=True
+        )
+        with get_db_context() as db:
+            job = db.get(IngestJob, job_uuid)
+            if job:
+                job.status = "failed"
+                job.message = f"Error processing trades: {str(e)}"[:500]
@@ -4,13 +4,22 @@ Metrics calculator for daily P&L series and aggregate statistics.
 Converts closed lots into:
 - Daily P&L series (EST timezone, continuous with zero-filled gaps)
 - Aggregate metrics (total P&L, win rate, profit factor, etc.)
+
+Sums are computed over int64 cents and converted to Decimal only when the
+PerDayPnL and Aggregate rows are built, so they match Decimal arithmetic
+exactly. Each lot's P&L passes through float64 on the way to cents, which
+is exact for amounts below $1 trillion per lot; bincount sums are
+exact below 2**53 cents. The few ratios (win rate, profit factor,
+averages) are divided in Decimal so half-up rounding is unchanged.
 """
 import logging
 from decimal import Decimal, ROUND_HALF_UP
-from typing import List, Dict, Tuple, Optional
-from datetime import datetime, date, timedelta
-from collections import defaultdict
-import pytz
+from typing import List, Tuple, Optional
+from dataclasses import dataclass
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
 
 from app.models.trade import ClosedLot
 from app.models.metrics import PerDayPnL, Aggregate
@@ -18,7 +27,143 @@ from app.models.metrics import PerDayPnL, Aggregate
 logger = logging.getLogger(__name__)
 
 # EST timezone
-EST = pytz.timezone('America/New_York')
+EST = ZoneInfo('America/New_York')
+
+_NS_PER_DAY = 86_400 * 10**9
+
+# Stored precision of P&L amounts and ratios, and of the win rate
+_CENT = Decimal('0.01')
+_WIN_RATE_STEP = Decimal('0.0001')
+
+_WEEKDAY_NAMES = [
+    "Monday", "Tuesday", "Wednesday", "Thursday",
+    "Friday", "Saturday", "Sunday"
+]
+
+
+@dataclass
+class _LotsSoA:
+    """
+    Closed lots as parallel arrays for the daily series and aggregates.
+
+    Symbols are interned once into int codes, so per-symbol sums are a
+    bincount over small integers rather than a dict update per lot. Symbols
+    and weekdays are factorized in order of first appearance, so
+    argmax/argmin over per-code sums break ties the same way as max/min
+    over a dict filled lot by lot.
+    """
+    pnl_cents: np.ndarray       # int64 realized P&L in cents
+    close_days: np.ndarray      # EST close day per lot, days since the epoch
+    symbol_codes: np.ndarray    # code per lot, indexes symbols
+    symbols: np.ndarray         # symbol per code
+    weekday_codes: np.ndarray   # code per lot, indexes weekdays
+    weekdays: np.ndarray        # EST weekday per code (Monday=0)
+
+
+def _lots_to_arrays(closed_lots: List[ClosedLot]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Close times (float64 epoch seconds) and realized P&L (int64 cents) of each lot.
+
+    Realized P&L is stored with cent precision, so rounding the float
+    value times 100 recovers the exact cent amount.
+    """
+    count = len(closed_lots)
+    close_seconds = np.fromiter(
+        (lot.close_executed_at.timestamp() for lot in closed_lots),
+        dtype=np.float64,
+        count=count
+    )
+    pnl = np.fromiter(
+        (float(lot.realized_pnl) for lot in closed_lots),
+        dtype=np.float64,
+        count=count
+    )
+    return close_seconds, np.rint(pnl * 100).astype(np.int64)
+
+
+def _close_days_est(close_seconds: np.ndarray) -> np.ndarray:
+    """EST calendar day of each close time, as int64 days since the epoch."""
+    # The zone is passed by name so pandas converts with its vectorized
+    # transition tables instead of calling the ZoneInfo object per element
+    local_ns = (
+        pd.to_datetime(close_seconds, unit="s", utc=True)
+        .tz_convert(EST.key)
+        .tz_localize(None)
+        .asi8
+    )
+    return local_ns // _NS_PER_DAY
+
+
+def _lots_to_soa(closed_lots: List[ClosedLot]) -> _LotsSoA:
+    """Convert closed lots to int64 cents, EST close days and symbol/weekday codes."""
+    close_seconds, pnl_cents = _lots_to_arrays(closed_lots)
+    # pd.factorize interns in C; a Python dict.setdefault pass is slower
+    symbol_codes, symbols = pd.factorize(
+        np.fromiter((lot.symbol for lot in closed_lots), dtype=object, count=len(closed_lots))
+    )
+    close_days = _close_days_est(close_seconds)
+    # 1970-01-01 was a Thursday (weekday 3)
+    weekday_codes, weekdays = pd.factorize((close_days + 3) % 7)
+    return _LotsSoA(
+        pnl_cents=pnl_cents,
+        close_days=close_days,
+        symbol_codes=symbol_codes,
+        symbols=symbols,
+        weekday_codes=weekday_codes,
+        weekdays=weekdays
+    )
+
+
+def _scatter(values: np.ndarray, positions: np.ndarray, size: int) -> np.ndarray:
+    """Place values at positions of a zero array of the given size."""
+    filled = np.zeros(size, dtype=values.dtype)
+    filled[positions] = values
+    return filled
+
+
+def _group_cents(codes: np.ndarray, pnl_cents: np.ndarray, size: int) -> np.ndarray:
+    """Sum cents per code; float64 bincount is exact below 2**53 cents."""
+    return np.bincount(codes, weights=pnl_cents, minlength=size).astype(np.int64)
+
+
+def _symbol_weekday_cents(lots: _LotsSoA) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Per-symbol and per-weekday P&L in cents from a single pass over the lots.
+
+    One bincount over the combined (symbol, weekday) code fills a small
+    symbols x weekdays table; both groupings are its row and column sums.
+    """
+    weekday_count = len(lots.weekdays)
+    table = _group_cents(
+        lots.symbol_codes * weekday_count + lots.weekday_codes,
+        lots.pnl_cents,
+        len(lots.symbols) * weekday_count
+    ).reshape(-1, weekday_count)
+    return table.sum(axis=1), table.sum(axis=0)
+
+
+def _best_and_worst(group_cents: np.ndarray, labels) -> Tuple[str, Decimal, str, Decimal]:
+    """
+    Label and P&L of the highest and lowest group.
+
+    argmax/argmin return the first code on ties, i.e. the group seen first.
+    """
+    best = int(group_cents.argmax())
+    worst = int(group_cents.argmin())
+    return (
+        labels[best], _cents_to_decimal(group_cents[best]),
+        labels[worst], _cents_to_decimal(group_cents[worst])
+    )
+
+
+def _cents_to_decimal(cents) -> Decimal:
+    """Exact Decimal dollars for an integer cent amount."""
+    return Decimal(int(cents)).scaleb(-2)
+
+
+def _round_cents(value: Optional[Decimal]) -> Optional[Decimal]:
+    """Round a ratio or average to cents; missing or zero values are stored as None."""
+    return value.quantize(_CENT, rounding=ROUND_HALF_UP) if value else None
 
 
 class MetricsCalculator:
@@ -28,6 +173,14 @@ class MetricsCalculator:
     
     def __init__(self, account_id: Optional[str] = None):
         self.account_id = account_id
+        # Last converted lot list and its arrays, shared by both methods
+        self._prepared: Optional[Tuple[List[ClosedLot], _LotsSoA]] = None
+    
+    def _prepare(self, closed_lots: List[ClosedLot]) -> _LotsSoA:
+        """Arrays for closed_lots, converted once per list object across both methods."""
+        if self._prepared is None or self._prepared[0] is not closed_lots:
+            self._prepared = (closed_lots, _lots_to_soa(closed_lots))
+        return self._prepared[1]
     
     def generate_daily_pnl_series(
         self,
@@ -50,60 +203,45 @@ class MetricsCalculator:
         
         logger.info(f"Generating daily P&L series from {len(closed_lots)} closed lots")
         
-        # Group lots by date (EST)
-        daily_lots: Dict[date, List[ClosedLot]] = defaultdict(list)
+        lots = self._prepare(closed_lots)
         
-        for lot in closed_lots:
-            # Convert close timestamp to EST date
-            close_dt_est = lot.close_executed_at.astimezone(EST)
-            close_date = close_dt_est.date()
-            daily_lots[close_date].append(lot)
-        
-        # Calculate daily P&L
-        daily_pnl_dict: Dict[date, Tuple[Decimal, int]] = {}
-        
-        for day, lots in daily_lots.items():
-            daily_total = sum(
-                Decimal(str(lot.realized_pnl)) for lot in lots
-            )
-            daily_pnl_dict[day] = (daily_total, len(lots))
-        
-        # Get date range
-        if not daily_pnl_dict:
-            return []
-        
-        min_date = min(daily_pnl_dict.keys())
-        max_date = max(daily_pnl_dict.keys())
+        # Group by close day: sort once, then sum each run of equal days
+        order = np.argsort(lots.close_days, kind="stable")
+        sorted_days = lots.close_days[order]
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(sorted_days)) + 1))
+        days = sorted_days[starts]
+        daily_cents = np.add.reduceat(lots.pnl_cents[order], starts)
+        lots_counts = np.diff(np.append(starts, len(sorted_days)))
         
         # Fill gaps if requested
         if fill_gaps:
-            current_date = min_date
-            while current_date <= max_date:
-                if current_date not in daily_pnl_dict:
-                    daily_pnl_dict[current_date] = (Decimal('0'), 0)
-                current_date += timedelta(days=1)
-        
-        # Create PerDayPnL objects with cumulative P&L
-        sorted_dates = sorted(daily_pnl_dict.keys())
-        cumulative_pnl = Decimal('0')
-        per_day_pnl_list = []
-        
-        for day in sorted_dates:
-            daily_total, lots_count = daily_pnl_dict[day]
-            cumulative_pnl += daily_total
-            
-            per_day_pnl = PerDayPnL(
-                account_id=self.account_id,
+            positions = days - days[0]
+            days = np.arange(days[0], days[-1] + 1)
+            daily_cents = _scatter(daily_cents, positions, len(days))
+            lots_counts = _scatter(lots_counts, positions, len(days))
+        
+        cumulative_cents = np.cumsum(daily_cents)
+        dates = days.astype("datetime64[D]").tolist()
+        min_date = dates[0]
+        max_date = dates[-1]
+        
+        # Create PerDayPnL objects; Decimal conversion happens once per day
+        account_id = self.account_id
+        per_day_pnl_list = [
+            PerDayPnL(
+                account_id=account_id,
                 date=day,
-                daily_pnl=daily_total.quantize(
-                    Decimal('0.01'), rounding=ROUND_HALF_UP
-                ),
-                cumulative_pnl=cumulative_pnl.quantize(
-                    Decimal('0.01'), rounding=ROUND_HALF_UP
-                ),
+                daily_pnl=_cents_to_decimal(daily_total),
+                cumulative_pnl=_cents_to_decimal(cumulative_pnl),
                 lots_closed=lots_count
             )
-            per_day_pnl_list.append(per_day_pnl)
+            for day, daily_total, cumulative_pnl, lots_count in zip(
+                dates,
+                daily_cents.tolist(),
+                cumulative_cents.tolist(),
+                lots_counts.tolist()
+            )
+        ]
         
         logger.info(
             f"Generated {len(per_day_pnl_list)} daily P&L records "
@@ -133,84 +271,48 @@ class MetricsCalculator:
         
         logger.info(f"Calculating aggregates from {len(closed_lots)} closed lots")
         
+        lots = self._prepare(closed_lots)
+        pnl_cents = lots.pnl_cents
+        
         # Basic totals
-        total_pnl = sum(Decimal(str(lot.realized_pnl)) for lot in closed_lots)
-        total_lots = len(closed_lots)
+        total_pnl = _cents_to_decimal(pnl_cents.sum())
+        total_lots = len(pnl_cents)
         
-        # Win/Loss analysis
-        winning_lots = [lot for lot in closed_lots if lot.realized_pnl > 0]
-        losing_lots = [lot for lot in closed_lots if lot.realized_pnl < 0]
+        # Win/Loss analysis: counts and clipped sums, no per-lot branching
+        winning_count = int(np.count_nonzero(pnl_cents > 0))
+        losing_count = int(np.count_nonzero(pnl_cents < 0))
         
-        total_gains = sum(
-            (Decimal(str(lot.realized_pnl)) for lot in winning_lots),
-            Decimal('0')
-        )
-        total_losses = sum(
-            (Decimal(str(lot.realized_pnl)) for lot in losing_lots),
-            Decimal('0')
-        )
+        total_gains = _cents_to_decimal(np.maximum(pnl_cents, 0).sum())
+        total_losses = _cents_to_decimal(np.minimum(pnl_cents, 0).sum())
         
         # Calculate ratios
         win_rate = None
         if total_lots > 0:
-            win_rate = Decimal(len(winning_lots)) / Decimal(total_lots)
+            win_rate = Decimal(winning_count) / Decimal(total_lots)
         
         profit_factor = None
         if total_losses < 0:
             profit_factor = total_gains / abs(total_losses)
         
         avg_gain = None
-        if winning_lots:
-            avg_gain = total_gains / Decimal(len(winning_lots))
-            logger.info(f"Average gain calculated: ${avg_gain} from {len(winning_lots)} winning lots")
+        if winning_count:
+            avg_gain = total_gains / Decimal(winning_count)
+            logger.info(f"Average gain calculated: ${avg_gain} from {winning_count} winning lots")
         
         avg_loss = None
-        if losing_lots:
-            avg_loss = total_losses / Decimal(len(losing_lots))
-            logger.info(f"Average loss calculated: ${avg_loss} from {len(losing_lots)} losing lots")
-        
-        # Best/Worst symbol
-        symbol_pnl: Dict[str, Decimal] = defaultdict(Decimal)
-        for lot in closed_lots:
-            symbol_pnl[lot.symbol] += Decimal(str(lot.realized_pnl))
+        if losing_count:
+            avg_loss = total_losses / Decimal(losing_count)
+            logger.info(f"Average loss calculated: ${avg_loss} from {losing_count} losing lots")
         
-        best_symbol = None
-        best_symbol_pnl = None
-        worst_symbol = None
-        worst_symbol_pnl = None
+        symbol_pnl, weekday_pnl = _symbol_weekday_cents(lots)
         
-        if symbol_pnl:
-            best_symbol = max(symbol_pnl.items(), key=lambda x: x[1])
-            worst_symbol = min(symbol_pnl.items(), key=lambda x: x[1])
-            best_symbol_pnl = best_symbol[1]
-            worst_symbol_pnl = worst_symbol[1]
-            best_symbol = best_symbol[0]
-            worst_symbol = worst_symbol[0]
-        
-        # Best/Worst weekday
-        weekday_pnl: Dict[str, Decimal] = defaultdict(Decimal)
-        weekday_names = [
-            "Monday", "Tuesday", "Wednesday", "Thursday",
-            "Friday", "Saturday", "Sunday"
-        ]
-        
-        for lot in closed_lots:
-            close_dt_est = lot.close_executed_at.astimezone(EST)
-            weekday_name = weekday_names[close_dt_est.weekday()]
-            weekday_pnl[weekday_name] += Decimal(str(lot.realized_pnl))
-        
-        best_weekday = None
-        best_weekday_pnl = None
-        worst_weekday = None
-        worst_weekday_pnl = None
-        
-        if weekday_pnl:
-            best_weekday = max(weekday_pnl.items(), key=lambda x: x[1])
-            worst_weekday = min(weekday_pnl.items(), key=lambda x: x[1])
-            best_weekday_pnl = best_weekday[1]
-            worst_weekday_pnl = worst_weekday[1]
-            best_weekday = best_weekday[0]
-            worst_weekday = worst_weekday[0]
+        # Best/Worst symbol and weekday
+        best_symbol, best_symbol_pnl, worst_symbol, worst_symbol_pnl = _best_and_worst(
+            symbol_pnl, lots.symbols
+        )
+        best_weekday, best_weekday_pnl, worst_weekday, worst_weekday_pnl = _best_and_worst(
+            weekday_pnl, [_WEEKDAY_NAMES[weekday] for weekday in lots.weekdays]
+        )
         
         # Date range
         first_trade_date = None
@@ -226,47 +328,27 @@ class MetricsCalculator:
         
         aggregate = Aggregate(
             account_id=self.account_id,
-            total_realized_pnl=total_pnl.quantize(
-                Decimal('0.01'), rounding=ROUND_HALF_UP
-            ),
+            total_realized_pnl=total_pnl,
             total_lots_closed=total_lots,
             total_trades=total_trades,
-            winning_lots=len(winning_lots),
-            losing_lots=len(losing_lots),
-            total_gains=total_gains.quantize(
-                Decimal('0.01'), rounding=ROUND_HALF_UP
-            ),
-            total_losses=total_losses.quantize(
-                Decimal('0.01'), rounding=ROUND_HALF_UP
-            ),
+            winning_lots=winning_count,
+            losing_lots=losing_count,
+            total_gains=total_gains,
+            total_losses=total_losses,
             win_rate=win_rate.quantize(
-                Decimal('0.0001'), rounding=ROUND_HALF_UP
+                _WIN_RATE_STEP, rounding=ROUND_HALF_UP
             ) if win_rate else None,
-            profit_factor=profit_factor.quantize(
-                Decimal('0.01'), rounding=ROUND_HALF_UP
-            ) if profit_factor else None,
-            average_gain=avg_gain.quantize(
-                Decimal('0.01'), rounding=ROUND_HALF_UP
-            ) if avg_gain else None,
-            average_loss=avg_loss.quantize(
-                Decimal('0.01'), rounding=ROUND_HALF_UP
-            ) if avg_loss else None,
+            profit_factor=_round_cents(profit_factor),
+            average_gain=_round_cents(avg_gain),
+            average_loss=_round_cents(avg_loss),
             best_symbol=best_symbol,
-            best_symbol_pnl=best_symbol_pnl.quantize(
-                Decimal('0.01'), rounding=ROUND_HALF_UP
-            ) if best_symbol_pnl else None,
+            best_symbol_pnl=best_symbol_pnl or None,
             worst_symbol=worst_symbol,
-            worst_symbol_pnl=worst_symbol_pnl.quantize(
-                Decimal('0.01'), rounding=ROUND_HALF_UP
-            ) if worst_symbol_pnl else None,
+            worst_symbol_pnl=worst_symbol_pnl or None,
             best_weekday=best_weekday,
-            best_weekday_pnl=best_weekday_pnl.quantize(
-                Decimal('0.01'), rounding=ROUND_HALF_UP
-            ) if best_weekday_pnl else None,
+            best_weekday_pnl=best_weekday_pnl or None,
             worst_weekday=worst_weekday,
-            worst_weekday_pnl=worst_weekday_pnl.quantize(
-                Decimal('0.01'), rounding=ROUND_HALF_UP
-            ) if worst_weekday_pnl else None,
+            worst_weekday_pnl=worst_weekday_pnl or None,
             first_trade_date=first_trade_date,
             last_trade_date=last_trade_date
         )
@@ -0,0 +1,380 @@
+"""
+Read-side queries behind the metrics and chart endpoints.
+
+Shared by the /api/v1 handlers and the demo endpoints so both build the
+same payloads without going through FastAPI request handling.
+"""
+import logging
+import threading
+from collections import OrderedDict
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Optional, Tuple
+from datetime import datetime, date, timedelta
+from sqlalchemy.orm import Session
+from sqlalchemy import Float, case, cast, func, lambda_stmt, select, tuple_
+
+from app.models.base import account_filter
+from app.models.metrics import PerDayPnL, Aggregate
+from app.models.trade import ClosedLot
+from app.services.metrics_calculator import EST
+
+logger = logging.getLogger(__name__)
+
+# Serialized aggregates keyed by (account_id, aggregate.updated_at). The row
+# is rewritten only by a metrics refresh, which bumps updated_at. Handlers run
+# in worker threads, so every access holds _AGGREGATE_CACHE_LOCK.
+_AGGREGATE_CACHE: "OrderedDict[Tuple[Optional[str], datetime], dict]" = OrderedDict()
+_AGGREGATE_CACHE_SIZE = 128
+_AGGREGATE_CACHE_LOCK = threading.Lock()
+
+_CENT = Decimal("0.01")
+_RATE_QUANTUM = Decimal("0.0001")
+
+# grouping(symbol, close_weekday) values for the timeframe breakdown query
+_TOTALS_SET = 3
+_SYMBOL_SET = 1
+_WEEKDAY_SET = 2
+
+# Trailing windows for relative timeframes (YTD is calendar-based)
+_TIMEFRAME_DELTAS = {
+    "1D": timedelta(days=1),
+    "1W": timedelta(weeks=1),
+    "1M": timedelta(days=30),
+    "3M": timedelta(days=90),
+    "6M": timedelta(days=180),
+    "1Y": timedelta(days=365),
+}
+
+# ClosedLot.close_weekday follows Postgres DOW numbering (0=Sunday)
+_DOW_NAMES = (
+    "Sunday", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"
+)
+
+
+def fetch_metrics(
+    db: Session,
+    account_id: Optional[str],
+    timeframe: Optional[str],
+    details: bool = True
+) -> dict:
+    """
+    Build the aggregate metrics payload for an account.
+
+    Args:
+        db: Database session
+        account_id: Account to read (None for the default/demo account)
+        timeframe: Optional timeframe filter (1D, 1W, 1M, 3M, 6M, 1Y, YTD, ALL)
+        details: Include win/loss and best/worst breakdowns for timeframes
+
+    Returns:
+        Metrics dict; timeframe-filtered metrics are recomputed from the
+        daily rollup and closed lots
+    """
+    # Timeframe requests are computed from the daily rollup and closed lots;
+    # the stored aggregate is not needed for them
+    if timeframe and timeframe != "ALL":
+        end_date = date.today()
+        start_date = _calculate_start_date(end_date, timeframe)
+
+        if start_date:
+            return _calculate_timeframe_metrics(
+                db, account_id, start_date, end_date, details
+            )
+
+    account_clause = account_filter(Aggregate, account_id)
+
+    # Only the version column is read until the payload has to be rebuilt
+    updated_at = db.execute(select(Aggregate.updated_at).where(account_clause)).scalar()
+
+    if updated_at is None:
+        logger.warning("No aggregate data found")
+        return {
+            "total_realized_pnl": 0,
+            "total_lots_closed": 0,
+            "win_rate": None,
+            "profit_factor": None,
+            "message": "No trading data available"
+        }
+
+    cache_key = (account_id, updated_at)
+    with _AGGREGATE_CACHE_LOCK:
+        cached = _AGGREGATE_CACHE.get(cache_key)
+        if cached is not None:
+            _AGGREGATE_CACHE.move_to_end(cache_key)
+            return cached
+
+    # Built outside the lock; a concurrent miss at worst serializes twice
+    aggregate = db.execute(select(Aggregate).where(account_clause)).scalar_one()
+    result = _serialize_aggregate(aggregate)
+
+    with _AGGREGATE_CACHE_LOCK:
+        _AGGREGATE_CACHE[cache_key] = result
+        if len(_AGGREGATE_CACHE) > _AGGREGATE_CACHE_SIZE:
+            _AGGREGATE_CACHE.popitem(last=False)
+
+    return result
+
+
+def fetch_chart(
+    db: Session,
+    account_id: Optional[str],
+    timeframe: Optional[str]
+) -> dict:
+    """
+    Build the daily P&L chart payload for an account.
+
+    Args:
+        db: Database session
+        account_id: Account to read (None for the default/demo account)
+        timeframe: Optional timeframe filter (1D, 1W, 1M, 3M, 6M, 1Y, YTD, ALL)
+
+    Returns:
+        Dict with the daily series as parallel lists (dates, daily_pnl,
+        cumulative_pnl, lots_closed) plus its date range
+    """
+    # Plain rows instead of ORM instances; Postgres returns the P&L columns
+    # as doubles so no per-row Decimal conversion is needed. Built as a
+    # lambda statement so the construct and its SQL are cached per worker.
+    query = lambda_stmt(lambda: select(
+        PerDayPnL.date,
+        cast(PerDayPnL.daily_pnl, Float).label("daily_pnl"),
+        cast(PerDayPnL.cumulative_pnl, Float).label("cumulative_pnl"),
+        PerDayPnL.lots_closed,
+    ).order_by(PerDayPnL.date))
+
+    # Separate lambdas, not account_filter(): each lambda's SQL is cached by
+    # code location, so the = / IS NULL forms must live in different lambdas
+    if account_id:
+        query += lambda s: s.where(PerDayPnL.account_id == account_id)
+    else:
+        query += lambda s: s.where(PerDayPnL.account_id.is_(None))
+
+    # Apply timeframe filter
+    if timeframe and timeframe != "ALL":
+        end_date = date.today()
+        start_date = _calculate_start_date(end_date, timeframe)
+
+        if start_date:
+            query += lambda s: s.where(PerDayPnL.date >= start_date)
+
+    rows = db.execute(query).all()
+
+    if not rows:
+        logger.warning("No chart data found")
+        return {
+            "dates": [],
+            "daily_pnl": [],
+            "cumulative_pnl": [],
+            "lots_closed": [],
+            "total_days": 0,
+            "message": "No trading data available"
+        }
+
+    # Columnar payload for the frontend: one list per field instead of a
+    # dict per day
+    dates, daily_pnl, cumulative_pnl, lots_closed = map(list, zip(*rows))
+
+    logger.info(f"Returning {len(dates)} chart data points")
+
+    return {
+        "dates": dates,
+        "daily_pnl": daily_pnl,
+        "cumulative_pnl": cumulative_pnl,
+        "lots_closed": lots_closed,
+        "start_date": dates[0],
+        "end_date": dates[-1],
+        "total_days": len(dates)
+    }
+
+
+def _serialize_aggregate(aggregate: Aggregate) -> dict:
+    """Convert a stored aggregate row into the metrics payload"""
+    return {
+        "cumulative_pnl": aggregate.total_realized_pnl,
+        "total_realized_pnl": aggregate.total_realized_pnl,
+        "total_lots_closed": aggregate.total_lots_closed,
+        "total_trades": aggregate.total_trades,
+        "winning_lots": aggregate.winning_lots,
+        "losing_lots": aggregate.losing_lots,
+        "total_gains": aggregate.total_gains,
+        "total_losses": aggregate.total_losses,
+        "win_rate": aggregate.win_rate or 0,
+        "profit_factor": aggregate.profit_factor or 0,
+        "avg_gain": aggregate.average_gain or 0,
+        "avg_loss": aggregate.average_loss or 0,
+        "average_gain": aggregate.average_gain or 0,
+        "average_loss": aggregate.average_loss or 0,
+        "best_symbol": aggregate.best_symbol,
+        "best_symbol_pnl": aggregate.best_symbol_pnl or None,
+        "worst_symbol": aggregate.worst_symbol,
+        "worst_symbol_pnl": aggregate.worst_symbol_pnl or None,
+        "best_weekday": aggregate.best_weekday,
+        "best_weekday_pnl": aggregate.best_weekday_pnl or None,
+        "worst_weekday": aggregate.worst_weekday,
+        "worst_weekday_pnl": aggregate.worst_weekday_pnl or None,
+        "first_trade_date": aggregate.first_trade_date.isoformat() if aggregate.first_trade_date else None,
+        "last_trade_date": aggregate.last_trade_date.isoformat() if aggregate.last_trade_date else None,
+    }
+
+
+def _calculate_start_date(end_date: date, timeframe: str) -> Optional[date]:
+    """Calculate start date based on timeframe"""
+    if timeframe == "YTD":
+        return date(end_date.year, 1, 1)
+    delta = _TIMEFRAME_DELTAS.get(timeframe)
+    return end_date - delta if delta else None
+
+
+def _timeframe_pnl_from_daily(
+    db: Session,
+    account_id: Optional[str],
+    start_date: date,
+    end_date: date
+):
+    """
+    Sum the precomputed daily P&L rows in a date range.
+
+    Returns a row of (total_pnl, lots_closed, first_date, last_date), where
+    the dates are the first and last days that closed a lot.
+    """
+    return db.query(
+        func.sum(PerDayPnL.daily_pnl).label("total_pnl"),
+        func.coalesce(func.sum(PerDayPnL.lots_closed), 0).label("lots_closed"),
+        func.min(PerDayPnL.date).filter(PerDayPnL.lots_closed > 0).label("first_date"),
+        func.max(PerDayPnL.date).filter(PerDayPnL.lots_closed > 0).label("last_date"),
+    ).filter(
+        account_filter(PerDayPnL, account_id),
+        PerDayPnL.date >= start_date,
+        PerDayPnL.date <= end_date,
+    ).one()
+
+
+def _calculate_timeframe_metrics(
+    db: Session,
+    account_id: Optional[str],
+    start_date: date,
+    end_date: date,
+    details: bool = True
+) -> dict:
+    """
+    Calculate metrics for a specific timeframe.
+
+    Totals and the date range come from the daily P&L rollup. Win/loss
+    statistics and best/worst symbol and weekday need closed lots; they are
+    computed in SQL with a single GROUPING SETS query, and only when
+    details is set. Rounding matches
+    MetricsCalculator.calculate_aggregates.
+    """
+    daily = _timeframe_pnl_from_daily(db, account_id, start_date, end_date)
+
+    if not daily.lots_closed:
+        return {
+            "total_realized_pnl": 0,
+            "total_lots_closed": 0,
+            "message": f"No data for timeframe {start_date} to {end_date}"
+        }
+
+    result = {
+        "total_realized_pnl": _round(daily.total_pnl),
+        "total_lots_closed": daily.lots_closed,
+        # Closed lots * 2 approximation, as in MetricsCalculator
+        "total_trades": daily.lots_closed * 2,
+        "first_trade_date": daily.first_date.isoformat() if daily.first_date else None,
+        "last_trade_date": daily.last_date.isoformat() if daily.last_date else None,
+        "timeframe": {
+            "start": start_date.isoformat(),
+            "end": end_date.isoformat()
+        }
+    }
+
+    if not details:
+        return result
+
+    # Half-open range over EST calendar days, matching the per_day_pnl dates
+    filters = [
+        ClosedLot.close_executed_at >= _est_start_of_day(start_date),
+        ClosedLot.close_executed_at < _est_start_of_day(end_date + timedelta(days=1)),
+        account_filter(ClosedLot, account_id),
+    ]
+    pnl = ClosedLot.realized_pnl
+
+    # Totals, per-symbol and per-weekday sums in one round trip. grouping()
+    # tells the sets apart: 3 = totals, 1 = per symbol, 2 = per weekday.
+    rows = db.query(
+        ClosedLot.symbol,
+        ClosedLot.close_weekday,
+        func.grouping(ClosedLot.symbol, ClosedLot.close_weekday).label("grouping_set"),
+        func.sum(pnl).label("pnl"),
+        func.count().label("total_lots"),
+        func.count().filter(pnl > 0).label("winning_lots"),
+        func.count().filter(pnl < 0).label("losing_lots"),
+        func.coalesce(func.sum(case((pnl > 0, pnl), else_=0)), 0).label("total_gains"),
+        func.coalesce(func.sum(case((pnl < 0, pnl), else_=0)), 0).label("total_losses"),
+    ).filter(*filters).group_by(
+        func.grouping_sets(tuple_(), ClosedLot.symbol, ClosedLot.close_weekday)
+    ).all()
+
+    totals = next(row for row in rows if row.grouping_set == _TOTALS_SET)
+    if not totals.total_lots:
+        return result
+
+    symbol_pnl = {row.symbol: row.pnl for row in rows if row.grouping_set == _SYMBOL_SET}
+    weekday_pnl = {
+        _DOW_NAMES[row.close_weekday]: row.pnl
+        for row in rows if row.grouping_set == _WEEKDAY_SET
+    }
+
+    best_symbol = max(symbol_pnl, key=symbol_pnl.get)
+    worst_symbol = min(symbol_pnl, key=symbol_pnl.get)
+    best_weekday = max(weekday_pnl, key=weekday_pnl.get)
+    worst_weekday = min(weekday_pnl, key=weekday_pnl.get)
+
+    total_gains = Decimal(totals.total_gains)
+    total_losses = Decimal(totals.total_losses)
+    win_rate = _round(
+        Decimal(totals.winning_lots) / Decimal(totals.total_lots), _RATE_QUANTUM
+    )
+    profit_factor = (
+        _round(total_gains / abs(total_losses)) if total_losses < 0 else None
+    )
+    average_gain = (
+        _round(total_gains / totals.winning_lots) if totals.winning_lots else None
+    )
+    average_loss = (
+        _round(total_losses / totals.losing_lots) if totals.losing_lots else None
+    )
+
+    result.update({
+        "winning_lots": totals.winning_lots,
+        "losing_lots": totals.losing_lots,
+        "total_gains": _round(total_gains),
+        "total_losses": _round(total_losses),
+        "win_rate": win_rate or None,
+        "profit_factor": profit_factor or None,
+        "average_gain": average_gain or None,
+        "average_loss": average_loss or None,
+        "best_symbol": best_symbol,
+        "best_symbol_pnl": _round_or_none(symbol_pnl[best_symbol]),
+        "worst_symbol": worst_symbol,
+        "worst_symbol_pnl": _round_or_none(symbol_pnl[worst_symbol]),
+        "best_weekday": best_weekday,
+        "best_weekday_pnl": _round_or_none(weekday_pnl[best_weekday]),
+        "worst_weekday": worst_weekday,
+        "worst_weekday_pnl": _round_or_none(weekday_pnl[worst_weekday]),
+    })
+    return result
+
+
+def _est_start_of_day(day: date) -> datetime:
+    """Midnight EST at the start of a calendar day, as an aware datetime"""
+    return datetime(day.year, day.month, day.day, tzinfo=EST)
+
+
+def _round(value: Decimal, quantum: Decimal = _CENT) -> Decimal:
+    """Round half-up to the given quantum"""
+    return Decimal(value).quantize(quantum, rounding=ROUND_HALF_UP)
+
+
+def _round_or_none(value: Decimal) -> Optional[Decimal]:
+    """Round to cents, mapping zero to None like the aggregates"""
+    return _round(value) or None
@@ -0,0 +1,226 @@
+"""
+Persistence of FIFO results and derived metrics after trades change.
+
+Shared by CSV ingest and the /metrics/process endpoint so both refresh
+closed lots, the daily P&L series and aggregates the same way.
+
+Daily P&L and aggregates are refreshed in place, like a materialized view:
+existing rows are matched by (account_id, date) and only changed values are
+written, so re-ingesting the same data produces no row churn. This is done in
+Python rather than with INSERT ... ON CONFLICT because the demo account is
+stored as account_id NULL, which never conflicts on a unique index.
+"""
+import logging
+from datetime import datetime
+from decimal import Decimal, ROUND_HALF_UP
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy import (
+    Date, Double, cast, delete, func, insert, literal_column, select
+)
+from sqlalchemy.orm import Session
+
+from app.models.base import account_filter
+from app.models.trade import ClosedLot
+from app.models.metrics import PerDayPnL, Aggregate
+from app.services.fifo_engine import ClosedLotRecord
+from app.services.metrics_calculator import MetricsCalculator
+
+logger = logging.getLogger(__name__)
+
+# Columns written by bulk inserts; id and created_at use column defaults.
+# Closed lots are inserted from ClosedLotRecord fields.
+_PER_DAY_PNL_FIELDS = ["account_id", "date", "daily_pnl", "cumulative_pnl", "lots_closed"]
+
+_CENT = Decimal("0.01")
+
+# Rows per INSERT batch; bounds statement size for large accounts
+_INSERT_BATCH_SIZE = 5000
+
+# Aggregate columns recomputed on every refresh
+_AGGREGATE_COLUMNS = [
+    column for column in Aggregate.__table__.columns
+    if column.key not in ("id", "account_id", "created_at", "updated_at")
+]
+
+
+def replace_closed_lots(
+    db: Session,
+    account_id: Optional[str],
+    closed_lots: Sequence[ClosedLotRecord]
+) -> None:
+    """Replace all closed lots for an account with a fresh FIFO result."""
+    # Set-based DELETE scoped to the account, without identity-map
+    # synchronization. Row-level locks only, so other accounts' lots and
+    # concurrent dashboard reads are unaffected.
+    db.execute(
+        delete(ClosedLot)
+        .where(account_filter(ClosedLot, account_id))
+        .execution_options(synchronize_session=False)
+    )
+
+    # Batched multi-row INSERTs straight from the FIFO records
+    _insert_batched(db, ClosedLot, [lot._asdict() for lot in closed_lots])
+
+
+def _insert_batched(db: Session, model, rows: List[dict]) -> None:
+    """Insert rows with Core INSERTs of at most _INSERT_BATCH_SIZE rows each."""
+    for start in range(0, len(rows), _INSERT_BATCH_SIZE):
+        db.execute(insert(model), rows[start:start + _INSERT_BATCH_SIZE])
+
+
+def refresh_metrics(
+    db: Session,
+    account_id: Optional[str],
+    closed_lots: Sequence[ClosedLotRecord]
+) -> Tuple[List[PerDayPnL], Aggregate]:
+    """
+    Recompute daily P&L and aggregates for an account and sync them to the DB.
+
+    Closed lots must already be written (see replace_closed_lots); the daily
+    series is computed from them in SQL.
+
+    Args:
+        db: Database session (caller commits)
+        account_id: Account to refresh (None for the default/demo account)
+        closed_lots: Full set of closed lots for the account
+
+    Returns:
+        Tuple of (persisted daily P&L rows, persisted aggregate)
+    """
+    calculator = MetricsCalculator(account_id=account_id)
+    daily_pnl_series = _daily_pnl_series(db, account_id)
+    aggregate = calculator.calculate_aggregates(closed_lots, daily_pnl_series)
+
+    daily_rows = _sync_daily_pnl(db, account_id, daily_pnl_series)
+    aggregate_row = _sync_aggregate(db, account_id, aggregate)
+    db.flush()
+
+    logger.info(
+        f"Metrics refreshed - account_id={account_id}, "
+        f"daily_records={len(daily_rows)}"
+    )
+
+    return daily_rows, aggregate_row
+
+
+def _daily_pnl_series(db: Session, account_id: Optional[str]) -> List[PerDayPnL]:
+    """
+    Build the gap-filled daily P&L series from stored closed lots.
+
+    Grouping uses the close_date generated column (EST calendar day), missing
+    days come from generate_series and the running total from a window SUM,
+    so no per-lot or per-day Python pass is needed.
+    """
+    daily = (
+        select(
+            ClosedLot.close_date.label("date"),
+            func.sum(ClosedLot.realized_pnl).label("daily_pnl"),
+            func.count().label("lots_closed")
+        )
+        .where(account_filter(ClosedLot, account_id))
+        .group_by(ClosedLot.close_date)
+        .cte("daily")
+    )
+    bounds = select(
+        func.min(daily.c.date).label("first_date"),
+        func.max(daily.c.date).label("last_date")
+    ).subquery("bounds")
+    days = select(
+        cast(
+            func.generate_series(bounds.c.first_date, bounds.c.last_date, literal_column("interval '1 day'")),
+            Date
+        ).label("date")
+    ).subquery("days")
+
+    daily_pnl = func.coalesce(daily.c.daily_pnl, 0)
+    rows = db.execute(
+        select(
+            days.c.date,
+            daily_pnl,
+            func.sum(daily_pnl).over(order_by=days.c.date),
+            func.coalesce(daily.c.lots_closed, 0)
+        )
+        .select_from(days.outerjoin(daily, daily.c.date == days.c.date))
+        .order_by(days.c.date)
+    )
+
+    return [
+        PerDayPnL(
+            account_id=account_id,
+            date=day,
+            daily_pnl=Decimal(day_pnl).quantize(_CENT, rounding=ROUND_HALF_UP),
+            cumulative_pnl=Decimal(cumulative_pnl).quantize(_CENT, rounding=ROUND_HALF_UP),
+            lots_closed=lots_closed
+        )
+        for day, day_pnl, cumulative_pnl, lots_closed in rows
+    ]
+
+
+def _sync_daily_pnl(
+    db: Session,
+    account_id: Optional[str],
+    daily_pnl_series: List[PerDayPnL]
+) -> List[PerDayPnL]:
+    """Update existing daily rows in place, insert new dates, drop stale ones."""
+    existing = {
+        row.date: row
+        for row in db.query(PerDayPnL).filter(account_filter(PerDayPnL, account_id))
+    }
+
+    rows = []
+    new_rows = []
+    for daily_pnl in daily_pnl_series:
+        row = existing.pop(daily_pnl.date, None)
+        if row is None:
+            new_rows.append(daily_pnl)
+            rows.append(daily_pnl)
+            continue
+
+        # Unchanged values are not written by the ORM
+        row.daily_pnl = daily_pnl.daily_pnl
+        row.cumulative_pnl = daily_pnl.cumulative_pnl
+        row.lots_closed = daily_pnl.lots_closed
+        rows.append(row)
+
+    if new_rows:
+        _insert_batched(db, PerDayPnL, [
+            {field: getattr(daily_pnl, field) for field in _PER_DAY_PNL_FIELDS}
+            for daily_pnl in new_rows
+        ])
+
+    if existing:
+        db.query(PerDayPnL).filter(
+            PerDayPnL.id.in_([row.id for row in existing.values()])
+        ).delete(synchronize_session=False)
+
+    return rows
+
+
+def _sync_aggregate(
+    db: Session,
+    account_id: Optional[str],
+    aggregate: Aggregate
+) -> Aggregate:
+    """Update the account's aggregate row in place, or insert it."""
+    row = db.query(Aggregate).filter(account_filter(Aggregate, account_id)).first()
+
+    if row is None:
+        db.add(aggregate)
+        return aggregate
+
+    for column in _AGGREGATE_COLUMNS:
+        value = getattr(aggregate, column.key)
+        if value is None and column.default is not None:
+            # Empty aggregates rely on column defaults (e.g. zero totals)
+            value = column.default.arg
+        elif value is not None and isinstance(column.type, Double):
+            # Compare as float so unchanged ratios are not rewritten
+            value = float(value)
+        setattr(row, column.key, value)
+
+    # Bump the version on every refresh, even when no aggregate column
+    # changed: insight caches keyed on updated_at also depend on the closed
+    # lots, which may differ (e.g. corrected timestamps) with equal totals
+    row.updated_at = datetime.utcnow()
+    return row
@@ -0,0 +1,95 @@
+"""
+Background reprocessing of an account's trades.
+
+POST /metrics/process records a ProcessingJob and returns; the FIFO run and
+metrics refresh happen here afterwards with their own session.
+"""
+import logging
+import uuid
+from typing import Optional
+
+import pandas as pd
+from sqlalchemy import select
+
+from app.database import get_db_context
+from app.models.base import account_filter
+from app.models.ingest import ProcessingJob
+from app.models.trade import NormalizedTrade
+from app.services.fifo_engine import FIFOEngine, TRADE_COLUMNS
+from app.services.metrics_refresh import replace_closed_lots, refresh_metrics
+
+logger = logging.getLogger(__name__)
+
+# Trade rows fetched per round trip while streaming
+TRADE_CHUNK_SIZE = 10000
+
+
+def run_process_trades(job_id: str, account_id: Optional[str]) -> None:
+    """
+    Process all of an account's trades through FIFO and refresh its metrics.
+
+    Failures are logged and recorded on the job rather than raised.
+
+    Args:
+        job_id: ProcessingJob to report results on
+        account_id: Account to process (None for the default account)
+    """
+    job_uuid = uuid.UUID(job_id)
+    logger.info(f"Processing trades for account_id={account_id} - job_id={job_id}")
+
+    try:
+        with get_db_context() as db:
+            # Stream only the matching columns through a server-side cursor
+            # instead of loading every trade. FIFO queues are per symbol, so
+            # ordering by (symbol, executed_at) lets the engine match each symbol
+            # as its rows arrive, and matches idx_account_symbol_executed_at.
+            # coerce_float=False keeps NUMERIC prices as Decimal (see FIFOEngine._match).
+            chunks = pd.read_sql(
+                select(*(getattr(NormalizedTrade, column) for column in TRADE_COLUMNS))
+                .where(account_filter(NormalizedTrade, account_id))
+                .order_by(NormalizedTrade.symbol, NormalizedTrade.executed_at)
+                .execution_options(stream_results=True, max_row_buffer=TRADE_CHUNK_SIZE),
+                db.connection(),
+                chunksize=TRADE_CHUNK_SIZE,
+                coerce_float=False
+            )
+
+            fifo_engine = FIFOEngine()
+            closed_lots = fifo_engine.process_chunks(chunks)
+            job = db.get(ProcessingJob, job_uuid)
+
+            if not fifo_engine.trades_processed:
+                logger.warning("No trades found to process")
+                job.status = "completed"
+                job.message = "No trades found to process"
+                job.trades_processed = 0
+                return
+
+            logger.info(
+                f"FIFO engine processed {fifo_engine.trades_processed} trades, "
+                f"generated {len(closed_lots)} closed lots"
+            )
+
+            # Replace closed lots and refresh metrics in place
+            replace_closed_lots(db, account_id, closed_lots)
+            daily_pnl_series, aggregate = refresh_metrics(db, account_id, closed_lots)
+
+            logger.info(f"Generated {len(daily_pnl_series)} daily P&L records")
+
+            job.status = "completed"
+            job.message = "Metrics processing complete"
+            job.trades_processed = fifo_engine.trades_processed
+            job.lots_closed = len(closed_lots)
+            job.daily_records = len(daily_pnl_series)
+            job.total_pnl = aggregate.total_realized_pnl
+            job.win_rate = float(aggregate.win_rate) if aggregate.win_rate else None
+
+        logger.info(f"Metrics processing complete - job_id={job_id}")
+
+    except Exception as e:
+        logger.error(f"Error processing trades - job_id={job_id}: {str(e)}", exc_info=True)
+        with get_db_context() as db:
+            job = db.get(ProcessingJob, job_uuid)
+            if job:
+                job.status = "failed"
+                job.message = f"Error processing trades: {str(e)}"[:500]
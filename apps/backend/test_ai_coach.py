@@ -8,6 +8,7 @@ Tests:
 4. Retry logic
 5. PRD compliance
 """
+import asyncio
 import json
 from app.services.ai_coach_service import AICoachService, AICoachResponse
 
@@ -33,7 +34,7 @@ def test_schema_validation():
     }
     
     service = AICoachService()
-    response = service.generate_insights(metrics)
+    response = asyncio.run(service.generate_insights(metrics))
     
     # Validate response structure
     assert isinstance(response, AICoachResponse), "Response must be AICoachResponse"
@@ -7,6 +7,7 @@ This script:
 3. Validates that insights reference specific metrics
 4. Compares old vs new insights quality
 """
+import asyncio
 import json
 from app.database import SessionLocal
 from app.models.trade import ClosedLot
@@ -114,7 +115,7 @@ def test_ai_insights_with_enhanced_metrics():
         # Generate insights
         print("\n🤖 Calling AI Coach Service...")
         ai_service = AICoachService()
-        insights = ai_service.generate_insights(metrics)
+        insights = asyncio.run(ai_service.generate_insights(metrics))
         
         print("\n✅ AI INSIGHTS GENERATED SUCCESSFULLY")
         
@@ -0,0 +1,197 @@
+"""
+Unit tests for the AI coach request batcher.
+
+Tests cover:
+- Size-based and time-based batch flushes
+- Splitting batches by model
+- Routing each result back to its caller
+- Retrying each prompt individually when a batched response is malformed
+- Failing each caller with its own error when the retry also fails
+"""
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+import pytest_asyncio
+
+from app.services import ai_coach_service
+from app.services.ai_coach_service import _InsightsBatcher
+
+
+def _insights(prompt):
+    """Minimal valid AICoachResponse payload that echoes its prompt."""
+    return {
+        "summary": prompt,
+        "pattern_insights": [],
+        "risk_notes": [],
+        "top_actions": []
+    }
+
+
+async def _stream(text):
+    """Yield text as streamed chat completion chunks."""
+    middle = len(text) // 2
+    for piece in (text[:middle], text[middle:]):
+        yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece))])
+
+
+class StubCompletions:
+    """Stand-in for AsyncOpenAI.chat.completions that records every call."""
+
+    def __init__(self, missing_results=0, fail_single=False):
+        self.calls = []
+        self.missing_results = missing_results
+        self.fail_single = fail_single
+
+    async def create(self, *, model, messages, response_format, **kwargs):
+        prompt = messages[-1]["content"]
+        schema_name = response_format["json_schema"]["name"]
+
+        if schema_name == "trading_insights_batch":
+            # Sections are "=== TRADER n ===\n<prompt>", after the header
+            prompts = [
+                section.split("\n", 1)[1].strip()
+                for section in prompt.split("=== TRADER ")[1:]
+            ]
+            results = [_insights(p) for p in prompts]
+            results = results[:len(results) - self.missing_results]
+            body = json.dumps({"results": results})
+        else:
+            prompts = [prompt]
+            body = json.dumps(_insights(prompt))
+
+        self.calls.append((model, schema_name, prompts))
+        if self.fail_single and schema_name == "trading_insights":
+            raise RuntimeError(f"completion failed for {prompt}")
+        return _stream(body)
+
+
+def _client(completions):
+    return SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+
+@pytest_asyncio.fixture
+async def batcher():
+    """Fresh batcher whose collector task is stopped before the loop closes."""
+    batcher = _InsightsBatcher()
+    yield batcher
+    if batcher._worker is not None:
+        batcher._worker.cancel()
+        await asyncio.gather(batcher._worker, return_exceptions=True)
+
+
+@pytest.mark.unit
+class TestInsightsBatcher:
+    """Tests for _InsightsBatcher micro-batching"""
+
+    @pytest.mark.asyncio
+    async def test_single_prompt_uses_single_schema(self, batcher):
+        """Test a lone prompt is sent with the single-response schema"""
+        completions = StubCompletions()
+
+        response = await batcher.submit(_client(completions), "model-a", "prompt-1")
+
+        assert response.summary == "prompt-1"
+        assert completions.calls == [("model-a", "trading_insights", ["prompt-1"])]
+
+    @pytest.mark.asyncio
+    async def test_time_based_flush_batches_concurrent_prompts(self, batcher):
+        """Test prompts arriving within the wait window share one completion"""
+        completions = StubCompletions()
+        client = _client(completions)
+
+        responses = await asyncio.gather(
+            *(batcher.submit(client, "model-a", f"prompt-{i}") for i in range(3))
+        )
+
+        assert [r.summary for r in responses] == ["prompt-0", "prompt-1", "prompt-2"]
+        assert completions.calls == [
+            ("model-a", "trading_insights_batch", ["prompt-0", "prompt-1", "prompt-2"])
+        ]
+        assert not batcher._dispatches
+
+    @pytest.mark.asyncio
+    async def test_time_based_flush_separates_later_prompts(self, batcher):
+        """Test a prompt arriving after the wait window gets its own completion"""
+        completions = StubCompletions()
+        client = _client(completions)
+
+        first = asyncio.ensure_future(batcher.submit(client, "model-a", "early"))
+        await asyncio.sleep(ai_coach_service._BATCH_MAX_WAIT * 4)
+        second = asyncio.ensure_future(batcher.submit(client, "model-a", "late"))
+
+        assert (await first).summary == "early"
+        assert (await second).summary == "late"
+        assert completions.calls == [
+            ("model-a", "trading_insights", ["early"]),
+            ("model-a", "trading_insights", ["late"])
+        ]
+
+    @pytest.mark.asyncio
+    async def test_size_based_flush(self, batcher, monkeypatch):
+        """Test a full batch is sent without waiting for the window to expire"""
+        monkeypatch.setattr(ai_coach_service, "_BATCH_MAX_WAIT", 30)
+        max_size = ai_coach_service._BATCH_MAX_SIZE
+        completions = StubCompletions()
+        client = _client(completions)
+
+        prompts = [f"prompt-{i}" for i in range(max_size)]
+        responses = await asyncio.wait_for(
+            asyncio.gather(*(batcher.submit(client, "model-a", p) for p in prompts)),
+            timeout=5
+        )
+
+        assert [r.summary for r in responses] == prompts
+        assert completions.calls == [("model-a", "trading_insights_batch", prompts)]
+
+    @pytest.mark.asyncio
+    async def test_batches_split_by_model(self, batcher):
+        """Test prompts for different models are sent as separate completions"""
+        completions = StubCompletions()
+        client = _client(completions)
+
+        requests = [("model-a", "a-1"), ("model-b", "b-1"), ("model-a", "a-2"), ("model-b", "b-2")]
+        responses = await asyncio.gather(
+            *(batcher.submit(client, model, prompt) for model, prompt in requests)
+        )
+
+        assert [r.summary for r in responses] == ["a-1", "b-1", "a-2", "b-2"]
+        assert sorted(completions.calls) == [
+            ("model-a", "trading_insights_batch", ["a-1", "a-2"]),
+            ("model-b", "trading_insights_batch", ["b-1", "b-2"])
+        ]
+
+    @pytest.mark.asyncio
+    async def test_result_count_mismatch_retries_individually(self, batcher):
+        """Test a batched response with too few results is retried per prompt"""
+        completions = StubCompletions(missing_results=1)
+        client = _client(completions)
+
+        prompts = [f"prompt-{i}" for i in range(3)]
+        responses = await asyncio.gather(
+            *(batcher.submit(client, "model-a", p) for p in prompts)
+        )
+
+        assert [r.summary for r in responses] == prompts
+        assert completions.calls[0] == ("model-a", "trading_insights_batch", prompts)
+        assert sorted(completions.calls[1:]) == [
+            ("model-a", "trading_insights", [p]) for p in prompts
+        ]
+
+    @pytest.mark.asyncio
+    async def test_failed_retry_fails_each_caller_separately(self, batcher):
+        """Test callers get their own error when the individual retry also fails"""
+        completions = StubCompletions(missing_results=1, fail_single=True)
+        client = _client(completions)
+
+        outcomes = await asyncio.gather(
+            *(batcher.submit(client, "model-a", f"prompt-{i}") for i in range(3)),
+            return_exceptions=True
+        )
+
+        assert len(completions.calls) == 4
+        assert all(isinstance(outcome, RuntimeError) for outcome in outcomes)
+        assert [str(outcome) for outcome in outcomes] == [
+            f"completion failed for prompt-{i}" for i in range(3)
+        ]
@@ -40,7 +40,19 @@ SPY,Short Sell,200,450.00,2024-02-01 11:00:00"""
         
         assert len(trades) == 1
         assert trades[0]["side"] == "SELL"
-    
+
+    def test_webull_side_case_insensitive(self):
+        """Test side values are matched regardless of case"""
+        csv_content = """Symbol,Action,Quantity,Price,Time
+SPY,bUy,200,450.00,2024-02-01 11:00:00
+SPY, SELL SHORT ,200,451.00,2024-02-01 11:05:00"""
+
+        parser = CSVParser("webull_v1")
+        trades, errors = parser.parse(csv_content)
+
+        assert len(errors) == 0
+        assert [trade["side"] for trade in trades] == ["BUY", "SELL"]
+
     def test_webull_missing_required_column(self):
         """Test error when required column is missing"""
         csv_content = """Symbol,Action,Price,Time
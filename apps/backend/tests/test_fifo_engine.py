@@ -14,8 +14,8 @@ from decimal import Decimal
 from datetime import datetime, timezone
 import uuid
 
-from app.services.fifo_engine import FIFOEngine
-from app.models.trade import NormalizedTrade
+from app.services.fifo_engine import FIFOEngine, ClosedLotRecord
+from app.models.trade import NormalizedTrade, ClosedLot
 
 
 @pytest.mark.unit
@@ -470,3 +470,15 @@ class TestFIFOEdgeCases:
         short_lot = closed_lots[1]
         assert short_lot.position_type == "SHORT"
         assert short_lot.realized_pnl == Decimal("500.00")
+
+
+@pytest.mark.unit
+def test_closed_lot_record_matches_columns():
+    """Test lot records carry exactly the ClosedLot columns written on insert"""
+    # id and created_at use column defaults; generated columns come from Postgres
+    writable = {
+        column.key for column in ClosedLot.__table__.columns
+        if column.key not in ("id", "created_at") and column.computed is None
+    }
+    
+    assert set(ClosedLotRecord._fields) == writable
@@ -20,10 +20,15 @@ AAPL,SELL,100,155.00,2024-01-20T14:00:00-05:00"""
     assert response.status_code == 200
     result = response.json()
     
-    assert result["status"] == "completed"
+    assert result["status"] == "processing"
     assert result["trades_processed"] == 2
     assert result["trades_failed"] == 0
     assert "job_id" in result
+    
+    # TestClient runs background tasks before returning the response
+    status = client.get(f"/api/v1/ingest/status/{result['job_id']}").json()
+    assert status["status"] == "completed"
+    assert status["lots_closed"] == 1
 
 
 @pytest.mark.integration
@@ -41,7 +46,7 @@ TSLA,SELL,50,200.00,2024-01-20 14:00:00"""
     assert response.status_code == 200
     result = response.json()
     
-    assert result["status"] == "completed"
+    assert result["status"] == "processing"
     assert result["trades_processed"] == 2
 
 
@@ -60,7 +65,7 @@ TSLA,sell,50.5,200.00,2024-01-20T14:00:00-05:00"""
     assert response.status_code == 200
     result = response.json()
     
-    assert result["status"] == "completed"
+    assert result["status"] == "processing"
     assert result["trades_processed"] == 2
 
 
@@ -124,7 +129,7 @@ TSLA,SELL,25,300.00,2024-01-17T10:30:00-05:00"""
     assert response.status_code == 200
     result = response.json()
     
-    assert result["status"] == "completed"
+    assert result["status"] == "processing"
     assert result["trades_processed"] == 2
     assert result["trades_failed"] == 1
     assert result["errors"] is not None
@@ -165,7 +170,15 @@ AAPL,BUY,100,150.00,2024-01-15T10:30:00-05:00"""
     assert response.status_code == 200
     result = response.json()
     
-    assert result["status"] == "completed"
+    assert result["status"] == "processing"
+
+
+@pytest.mark.integration
+def test_ingest_status_unknown_job(client):
+    """Test status lookup with a malformed job ID"""
+    response = client.get("/api/v1/ingest/status/not-a-job")
+    
+    assert response.status_code == 404
 
 
 @pytest.mark.integration
@@ -11,12 +11,12 @@ import pytest
 from decimal import Decimal
 from datetime import datetime, date, timezone
 import uuid
-import pytz
+from zoneinfo import ZoneInfo
 
 from app.services.metrics_calculator import MetricsCalculator
 from app.models.trade import ClosedLot
 
-EST = pytz.timezone('America/New_York')
+EST = ZoneInfo('America/New_York')
 
 
 @pytest.mark.unit
@@ -1,13 +1,10 @@
 import { useEffect, useRef, useState } from 'react';
 import Plot from 'react-plotly.js';
 import { motion } from 'framer-motion';
-import type { Timeframe } from '../pages/Dashboard';
+import type { ChartSeries, Timeframe } from '../pages/Dashboard';
 
 interface PLChartProps {
-  data: Array<{
-    date: string;
-    cumulative_pnl: number;
-  }>;
+  data: ChartSeries;
   benchmarks: string[];
   timeframe: Timeframe;
 }
@@ -35,8 +32,8 @@ export default function PLChart({ data, benchmarks, timeframe }: PLChartProps) {
   }, [benchmarks, timeframe]);
 
   // Prepare main P&L trace with color coding
-  const dates = data.map((d) => d.date);
-  const pnlValues = data.map((d) => d.cumulative_pnl);
+  const dates = data.dates;
+  const pnlValues = data.cumulative_pnl;
 
   // Split into segments at zero crossings for color coding
   const segments: Array<{
@@ -51,7 +48,7 @@ export default function PLChart({ data, benchmarks, timeframe }: PLChartProps) {
     color: pnlValues[0] >= 0 ? '#16a34a' : '#dc2626',
   };
 
-  for (let i = 0; i < data.length; i++) {
+  for (let i = 0; i < dates.length; i++) {
     const val = pnlValues[i];
     const color = val >= 0 ? '#16a34a' : '#dc2626';
 
@@ -22,10 +22,13 @@ interface DashboardData {
     best_weekday: string;
     worst_weekday: string;
   };
-  chart_data: Array<{
-    date: string;
-    cumulative_pnl: number;
-  }>;
+  chart_data: ChartSeries;
+}
+
+// Columnar chart payload: parallel arrays, one entry per day
+export interface ChartSeries {
+  dates: string[];
+  cumulative_pnl: number[];
 }
 
 export default function Dashboard() {
@@ -76,7 +79,10 @@ export default function Dashboard() {
       // Combine results
       const combinedData = {
         metrics: metricsResult.metrics || metricsResult,
-        chart_data: chartResult.data || []
+        chart_data: {
+          dates: chartResult.dates || [],
+          cumulative_pnl: chartResult.cumulative_pnl || []
+        }
       };
       console.log('Dashboard data received:', combinedData);
       console.log('avg_gain:', combinedData.metrics.avg_gain);
@@ -129,7 +135,7 @@ export default function Dashboard() {
   }
 
   // Empty state: no trades found
-  if (data.metrics.total_trades === 0 || data.chart_data.length === 0) {
+  if (data.metrics.total_trades === 0 || data.chart_data.dates.length === 0) {
     return (
       <div className="min-h-screen bg-gray-900 text-white flex items-center justify-center p-4">
         <motion.div
@@ -5,6 +5,10 @@ import config from '../config';
 
 type BrokerTemplate = 'webull_v1' | 'robinhood_v1' | 'unified_v1';
 
+// Background processing status polling
+const STATUS_POLL_INTERVAL_MS = 500;
+const STATUS_POLL_TIMEOUT_MS = 2 * 60 * 1000;
+
 export default function Landing() {
   const navigate = useNavigate();
   const [selectedTemplate, setSelectedTemplate] = useState<BrokerTemplate>('unified_v1');
@@ -45,6 +49,28 @@ export default function Landing() {
       }
 
       const data = await response.json();
+
+      // Metrics are calculated in the background; wait for the job to finish
+      // A worker restart mid-job leaves it 'processing' forever, so stop
+      // waiting after STATUS_POLL_TIMEOUT_MS
+      let status = data.status;
+      const deadline = Date.now() + STATUS_POLL_TIMEOUT_MS;
+      while (status === 'processing') {
+        if (Date.now() >= deadline) {
+          throw new Error('Processing is taking too long. Please try uploading again.');
+        }
+        await new Promise((resolve) => setTimeout(resolve, STATUS_POLL_INTERVAL_MS));
+        const statusResponse = await fetch(`${apiBase}/api/v1/ingest/status/${data.job_id}`);
+        if (!statusResponse.ok) {
+          throw new Error('Failed to check processing status');
+        }
+        const statusData = await statusResponse.json();
+        status = statusData.status;
+        if (status === 'failed') {
+          throw new Error(statusData.message || 'Processing failed');
+        }
+      }
+
       // Navigate to dashboard with job_id
       navigate(`/dashboard?job_id=${data.job_id}`);
     } catch (err) {